@@ -3,30 +3,39 @@ Smart Study & Focus Companion - FastAPI Backend
 Modern REST API for the study tracker.
 """
 
-import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime
+from typing import Callable, List, Optional
+from datetime import datetime, date
+from email.utils import formatdate
 import uuid
 
-# Add parent directory to import focus_companion
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
 from focus_companion import (
-    StudySession, load_sessions, save_session,
+    StudySession, load_sessions, save_session, sessions_signature,
     TopicDriftDetector, OverconfidenceDetector,
     RevisionTaskGenerator, NextSessionPlanner,
     WeeklyReportGenerator, AIEngine
 )
 
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
 app = FastAPI(
     title="Study Companion API",
     description="AI-powered study tracking and focus analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=OrjsonResponse
 )
 
 # CORS for React dev server
@@ -84,41 +93,101 @@ class AnalysisResponse(BaseModel):
     summary: str
     topic_relevance: float
     focus_feedback: str
-    drift: dict
-    overconfidence: dict
+    topic_drift_detected: bool
+    drift_details: str
+    overconfidence_detected: bool
+    overconfidence_details: str
     revision_tasks: List[str]
     next_session_plan: str
 
 
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+# Serialized bodies of the read-only endpoints, keyed by endpoint name.
+# Each entry is tagged with the sessions file signature and the current
+# date (reports are relative to the current week), so saves from either
+# the API or the CLI invalidate it without explicit bookkeeping.
+_RESPONSE_CACHE: dict = {}
+
+
+def _cached_json(request: Request, name: str, build: Callable[[], object]) -> Response:
+    """Serve a JSON body that is rebuilt only when the session data changes."""
+    signature = sessions_signature()
+    headers = {}
+    if signature is None:
+        version = f"empty-{date.today().isoformat()}"
+    else:
+        mtime_ns, size = signature
+        version = f"{mtime_ns}-{size}-{date.today().isoformat()}"
+        headers["Last-Modified"] = formatdate(mtime_ns / 1e9, usegmt=True)
+    headers["ETag"] = f'"{name}-{version}"'
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    cached = _RESPONSE_CACHE.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, orjson.dumps(build()))
+        _RESPONSE_CACHE[name] = cached
+
+    return Response(cached[1], media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=4)
+def _generate_report_cached(signature: Optional[tuple], today: date) -> tuple:
+    """Weekly report and total hours for one version of the sessions file.
+
+    ``signature`` changes whenever a session is saved, and ``today`` keeps
+    the week-relative figures correct across midnight, so the cache is
+    invalidated implicitly. Callers must treat the result as read-only.
+    """
+    sessions = load_sessions()
+    report = WeeklyReportGenerator.generate(sessions)
+    total_hours = round(sum(s.actual_minutes for s in sessions) / 60, 1)
+    return report, total_hours, len(sessions)
+
+
+def _weekly_report() -> tuple:
+    """Return ``(report, total_hours, session_count)`` for the current data."""
+    return _generate_report_cached(sessions_signature(), date.today())
+
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
+# Endpoints that touch the sessions file or call Claude are plain ``def``
+# so FastAPI runs them in its threadpool instead of blocking the event loop.
+# Endpoints returning an OrjsonResponse skip FastAPI's validation, so their
+# schemas are documented with ``responses=`` rather than ``response_model``.
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
-@app.get("/api/sessions", response_model=List[SessionResponse])
-async def get_sessions():
+@app.get("/api/sessions")
+def get_sessions(request: Request):
     """Get all study sessions."""
-    sessions = load_sessions()
-    return [s.to_dict() for s in sessions]
+    return _cached_json(request, "sessions",
+                        lambda: [s.to_dict() for s in load_sessions()])
 
 
-@app.get("/api/sessions/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: str):
+@app.get("/api/sessions/{session_id}")
+def get_session(session_id: str):
     """Get a specific session by ID."""
     sessions = load_sessions()
     session = next((s for s in sessions if s.id == session_id), None)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session.to_dict()
+    return OrjsonResponse(session.to_dict())
 
 
-@app.post("/api/sessions", response_model=SessionResponse)
-async def create_session(data: SessionCreate):
+@app.post("/api/sessions", responses={200: {"model": SessionResponse}})
+def create_session(data: SessionCreate):
     """Create a new study session with AI analysis."""
     # Calculate break stats
     breaks_list = [b.model_dump() for b in data.breaks]
@@ -154,10 +223,10 @@ async def create_session(data: SessionCreate):
         topic_relevance_score=analysis['topic_relevance'],
         focus_feedback=analysis['focus_feedback'],
         completed=True,
-        topic_drift_detected=analysis['drift']['detected'],
-        drift_details=analysis['drift']['details'],
-        overconfidence_detected=analysis['overconfidence']['detected'],
-        overconfidence_details=analysis['overconfidence']['details'],
+        topic_drift_detected=analysis['topic_drift_detected'],
+        drift_details=analysis['drift_details'],
+        overconfidence_detected=analysis['overconfidence_detected'],
+        overconfidence_details=analysis['overconfidence_details'],
         revision_tasks=analysis['revision_tasks'],
         next_session_plan=analysis['next_session_plan']
     )
@@ -165,19 +234,18 @@ async def create_session(data: SessionCreate):
     # Save session
     save_session(session)
 
-    return session.to_dict()
+    return OrjsonResponse(session.to_dict())
 
 
 @app.get("/api/report")
-async def get_weekly_report():
+def get_weekly_report(request: Request):
     """Get weekly study report with analytics."""
-    sessions = load_sessions()
-    report = WeeklyReportGenerator.generate(sessions)
-    return report
+    return _cached_json(request, "report",
+                        lambda: _weekly_report()[0])
 
 
-@app.post("/api/analyze")
-async def analyze_notes(data: SessionCreate) -> AnalysisResponse:
+@app.post("/api/analyze", responses={200: {"model": AnalysisResponse}})
+def analyze_notes(data: SessionCreate):
     """Analyze notes without saving session (preview)."""
     all_sessions = load_sessions()
     breaks_list = [b.model_dump() for b in data.breaks]
@@ -194,14 +262,13 @@ async def analyze_notes(data: SessionCreate) -> AnalysisResponse:
         all_sessions=all_sessions
     )
 
-    return analysis
+    return OrjsonResponse(analysis)
 
 
-@app.get("/api/stats")
-async def get_stats():
-    """Get quick stats for the header."""
-    sessions = load_sessions()
-    if not sessions:
+def _build_stats() -> dict:
+    """Build the /api/stats payload."""
+    report, total_hours, count = _weekly_report()
+    if not count:
         return {
             "total_sessions": 0,
             "total_hours": 0,
@@ -209,23 +276,39 @@ async def get_stats():
             "current_streak": 0
         }
 
-    report = WeeklyReportGenerator.generate(sessions)
-    total_minutes = sum(s.actual_minutes for s in sessions)
-
     return {
-        "total_sessions": len(sessions),
-        "total_hours": round(total_minutes / 60, 1),
+        "total_sessions": count,
+        "total_hours": total_hours,
         "avg_relevance": round(report['overview']['this_week']['avg_relevance'], 1),
         "current_streak": report['streak']
     }
 
 
+@app.get("/api/stats")
+def get_stats(request: Request):
+    """Get quick stats for the header."""
+    return _cached_json(request, "stats", _build_stats)
+
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
 
 if __name__ == "__main__":
+    # Run from the repository root: python -m api.main
+    import os
     import uvicorn
-    # Note: reload=True requires passing app as string, but that doesn't work
-    # with paths containing special characters. Use reload=False for stability.
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=False)
+    # loop/http "auto" pick uvloop and httptools when installed
+    # (pip install "uvicorn[standard]") and fall back to asyncio/h11 otherwise.
+    uvicorn.run(
+        "api.main:app",
+        app_dir=str(Path(__file__).resolve().parent.parent),
+        host="0.0.0.0",
+        port=8000,
+        reload=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="auto",
+        http="auto",
+        log_level=os.getenv("LOG_LEVEL", "info"),
+        access_log=os.getenv("ACCESS_LOG", "1") != "0",
+    )
@@ -23,45 +23,190 @@ Phase 3: Weekly Reports
 - Actionable weekly recommendations
 """
 
+import io
 import json
 import time
 import os
 import re
 import sys
 import argparse
+import hashlib
 import random
-from datetime import datetime, timedelta
+import shutil
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import redirect_stdout
+from functools import lru_cache, wraps
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 from typing import List, Optional, Dict, Any, Tuple
 from collections import defaultdict
 import textwrap
 import math
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is used otherwise
+    orjson = None
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
-SESSIONS_FILE = DATA_DIR / "sessions.json"
+SESSIONS_FILE = DATA_DIR / "sessions.jsonl"
+LEGACY_SESSIONS_FILE = DATA_DIR / "sessions.json"
+CLAUDE_CACHE_DIR = DATA_DIR / "claude_cache"
+CLAUDE_CACHE_MAX_ENTRIES = 512
 
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+
+# Instructions shared by every session analysis. Kept out of the per-session
+# message so the prefix is identical across calls and eligible for prompt
+# caching.
+CLAUDE_SYSTEM_PROMPT = """You review a student's study session from its topic, notes and timing.
+
+Provide:
+1. SUMMARY (2 sentences): What did they learn?
+2. TOPIC_RELEVANCE (0-100): How well do notes match the topic?
+3. FOCUS_FEEDBACK (2 sentences): Constructive feedback.
+4. REVISION_TASKS (3-4): SHORT, SPECIFIC tasks that will help the student actually learn the material.
+   Tasks should be actionable (start with a verb) and completable in 5-15 minutes each.
+   If the notes drift away from the topic, include a task that brings them back to it.
+
+Report them with the session_report tool."""
+
+# Claude is forced to answer through this tool, so the reply arrives as an
+# already-parsed dict that matches the schema instead of JSON inside prose.
+SESSION_REPORT_TOOL = {
+    "name": "session_report",
+    "description": "Record the analysis of one study session.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "topic_relevance": {"type": "number", "minimum": 0, "maximum": 100},
+            "focus_feedback": {"type": "string"},
+            "revision_tasks": {
+                "type": "array",
+                "items": {"type": "string"},
+                "maxItems": 4
+            }
+        },
+        "required": ["summary", "topic_relevance", "focus_feedback", "revision_tasks"]
+    }
+}
+
+
+def _json_line(obj) -> bytes:
+    """Serialize one JSON Lines record, trailing newline included, as UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _json_loads(text):
+    """Parse JSON text, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+_CLAUDE_CLIENT = None
+
+
+def _claude_client():
+    """Return the shared Anthropic client, creating it on first use.
+
+    Reusing one client keeps its HTTP connection pool warm, so repeated
+    calls skip the TLS handshake. Raises ImportError if the anthropic
+    package isn't installed; callers already fall back to local analysis.
+    The timeout is far below the SDK's 10-minute default: a student waiting
+    at the end of a session is better served by the local fallback.
+    """
+    global _CLAUDE_CLIENT
+    if _CLAUDE_CLIENT is None:
+        import anthropic
+        _CLAUDE_CLIENT = anthropic.Anthropic(
+            api_key=ANTHROPIC_API_KEY, max_retries=2, timeout=30.0
+        )
+    return _CLAUDE_CLIENT
+
+
+def _disk_cached(func=None, *, key=None):
+    """Persist a Claude helper's results in CLAUDE_CACHE_DIR across runs.
+
+    Entries are keyed by a hash of the function name and its arguments, one
+    JSON file each, and the least recently used are evicted beyond
+    CLAUDE_CACHE_MAX_ENTRIES. The hash also covers the model, system prompt
+    and tool schema, so changing any of them stops old answers from being
+    served; the orphaned files are evicted in time. ``key``, if given, maps
+    the arguments to the JSON-serializable values hashed instead, so inputs
+    that differ only in ways that don't matter share an entry while the
+    function still sees them as passed. Results must be JSON-serializable
+    tuples. Exceptions propagate without storing anything, and a cache that
+    can't be read or written is simply bypassed.
+    """
+    if func is None:
+        return lambda f: _disk_cached(f, key=key)
+
+    @wraps(func)
+    def wrapper(*args):
+        key_args = key(*args) if key is not None else args
+        payload = json.dumps(
+            [func.__name__, CLAUDE_MODEL, CLAUDE_SYSTEM_PROMPT, SESSION_REPORT_TOOL, *key_args],
+            ensure_ascii=False
+        )
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        path = CLAUDE_CACHE_DIR / f"{digest}.json"
+        try:
+            result = tuple(_json_loads(path.read_bytes()))
+            os.utime(path)  # mark as recently used
+            return result
+        except (OSError, ValueError, TypeError):
+            pass
+
+        result = func(*args)
+        try:
+            CLAUDE_CACHE_DIR.mkdir(exist_ok=True)
+            # A temp file per writer, so workers filling the same key don't
+            # interleave their bytes before the atomic rename
+            with tempfile.NamedTemporaryFile(dir=CLAUDE_CACHE_DIR, suffix=".tmp",
+                                             delete=False) as tmp:
+                tmp.write(_json_line(list(result)))
+            try:
+                os.replace(tmp.name, path)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+            entries = list(CLAUDE_CACHE_DIR.glob("*.json"))
+            if len(entries) > CLAUDE_CACHE_MAX_ENTRIES:
+                entries.sort(key=lambda p: p.stat().st_mtime_ns)
+                for stale in entries[:len(entries) - CLAUDE_CACHE_MAX_ENTRIES]:
+                    stale.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return result
+    return wrapper
 
 
 # ============================================================================
 # DATA MODELS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Break:
-    """Represents a break taken during study."""
+    """Represents a break taken during study (stored as a plain dict in sessions)."""
     start_time: str
     end_time: str
     duration_seconds: int
 
 
-@dataclass
+@dataclass(slots=True)
 class StudySession:
     """Complete study session data."""
     id: str
@@ -83,64 +228,230 @@ class StudySession:
     drift_details: str = ""
     overconfidence_detected: bool = False
     overconfidence_details: str = ""
-    revision_tasks: List[str] = None
+    revision_tasks: List[str] = field(default_factory=list)
     next_session_plan: str = ""
+    # Derived from start_time/topic on first use, each stored with the
+    # string it came from so reassigning the field invalidates it; not
+    # serialized
+    _start_date: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _topic_lower: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def start_date(self) -> date:
+        """Calendar date the session started (parsed once per start_time)."""
+        cached = self._start_date
+        if cached is None or cached[0] is not self.start_time:
+            cached = self._start_date = (
+                self.start_time, datetime.fromisoformat(self.start_time).date()
+            )
+        return cached[1]
 
-    def __post_init__(self):
-        if self.revision_tasks is None:
-            self.revision_tasks = []
+    @property
+    def topic_lower(self) -> str:
+        """Lowercased topic (computed once per topic)."""
+        cached = self._topic_lower
+        if cached is None or cached[0] is not self.topic:
+            cached = self._topic_lower = (self.topic, self.topic.lower())
+        return cached[1]
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Shallow on purpose: asdict() deep-copies every note and break,
+        # and callers only serialize the result.
+        return {name: getattr(self, name) for name in _SESSION_FIELDS}
 
     @classmethod
     def from_dict(cls, data: dict) -> "StudySession":
-        # Handle missing Phase 2 fields for backward compatibility
-        defaults = {
-            "topic_drift_detected": False,
-            "drift_details": "",
-            "overconfidence_detected": False,
-            "overconfidence_details": "",
-            "revision_tasks": [],
-            "next_session_plan": ""
-        }
-        for key, default in defaults.items():
-            if key not in data:
-                data[key] = default
+        # Records saved before Phase 2 lack those fields; the dataclass
+        # defaults fill them in, so trusted data goes straight to __init__
+        # without copying or patching the dict.
         return cls(**data)
 
 
+_SESSION_FIELDS = tuple(f.name for f in fields(StudySession) if f.init)
+
+
 # ============================================================================
 # DATA PERSISTENCE
 # ============================================================================
 
+def _write_sessions_file(records: List[dict]) -> None:
+    """Replace the sessions file atomically (temp file + os.replace)."""
+    tmp_file = SESSIONS_FILE.with_suffix(".jsonl.tmp")
+    tmp_file.write_bytes(b"".join(_json_line(r) for r in records))
+    os.replace(tmp_file, SESSIONS_FILE)
+
+
+def _migrate_legacy_sessions() -> None:
+    """Convert the pre-JSONL sessions.json file to JSON Lines (one-shot)."""
+    if SESSIONS_FILE.exists() or not LEGACY_SESSIONS_FILE.exists():
+        return
+
+    with open(LEGACY_SESSIONS_FILE, "r", encoding="utf-8") as f:
+        sessions = json.load(f).get("sessions", [])
+
+    _write_sessions_file(sessions)
+    LEGACY_SESSIONS_FILE.rename(LEGACY_SESSIONS_FILE.with_suffix(".json.bak"))
+
+
+# Parsed sessions, reused until the sessions file changes on disk, plus
+# their start times for range lookups ("ordered" is False if the file
+# isn't in chronological order, e.g. after a hand edit). The lists are
+# replaced rather than mutated, and only under _CACHE_LOCK, so a reader
+# holding them sees a consistent snapshot while API threads save.
+_CACHE = {"signature": None, "sessions": [], "start_times": [], "ordered": True}
+_CACHE_LOCK = threading.Lock()
+
+
+def sessions_signature() -> Optional[Tuple[int, int]]:
+    """
+    Fingerprint of the sessions file: (mtime_ns, size), or None if missing.
+
+    The size catches appends that land within the filesystem's mtime
+    resolution (a whole second or more on some filesystems).
+    """
+    try:
+        st = SESSIONS_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _current_signature() -> Optional[Tuple[int, int]]:
+    """sessions_signature(), migrating the legacy file first if there's no JSONL file yet."""
+    signature = sessions_signature()
+    if signature is None and LEGACY_SESSIONS_FILE.exists():
+        _migrate_legacy_sessions()
+        signature = sessions_signature()
+    return signature
+
+
+def _cache_snapshot() -> Tuple[List[StudySession], List[str], bool]:
+    """(sessions, start_times, ordered), re-parsed if the file changed. Do not mutate."""
+    with _CACHE_LOCK:
+        signature = _current_signature()
+        if signature is None:
+            return [], [], True
+        if signature != _CACHE["signature"]:
+            # One read and one parse: the lines are joined into a JSON array so
+            # the decoder runs once instead of once per session.
+            lines = [line for line in SESSIONS_FILE.read_bytes().splitlines() if line.strip()]
+            records = _json_loads(b"[" + b",".join(lines) + b"]")
+            sessions = [StudySession.from_dict(r) for r in records]
+            start_times = [s.start_time for s in sessions]
+            _CACHE["sessions"] = sessions
+            _CACHE["start_times"] = start_times
+            _CACHE["ordered"] = all(a <= b for a, b in zip(start_times, start_times[1:]))
+            _CACHE["signature"] = signature
+        return _CACHE["sessions"], _CACHE["start_times"], _CACHE["ordered"]
+
+
+def _cached_sessions() -> List[StudySession]:
+    """The shared session cache, re-parsed if the file changed. Do not mutate."""
+    return _cache_snapshot()[0]
+
+
 def load_sessions() -> List[StudySession]:
-    """Load all sessions from file."""
-    if SESSIONS_FILE.exists():
-        with open(SESSIONS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return [StudySession.from_dict(s) for s in data.get("sessions", [])]
-    return []
+    """Load all sessions from file (cached until the file changes)."""
+    return list(_cached_sessions())
 
 
-def save_session(session: StudySession) -> None:
-    """Save a session to file."""
-    sessions = []
-    if SESSIONS_FILE.exists():
-        with open(SESSIONS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            sessions = data.get("sessions", [])
+def sessions_started_between(start: str, end: Optional[str] = None) -> List[StudySession]:
+    """
+    Sessions whose ISO start_time is in [start, end), e.g. a day or a week.
+
+    Sessions are appended in time order, so this bisects the cached start
+    times instead of scanning the whole history; it falls back to a scan
+    if the file is out of order.
+    """
+    sessions, times, ordered = _cache_snapshot()
+    if not ordered:
+        return [s for s in sessions
+                if start <= s.start_time and (end is None or s.start_time < end)]
+    lo = bisect_left(times, start)
+    hi = len(times) if end is None else bisect_left(times, end, lo)
+    return sessions[lo:hi]
 
-    sessions.append(session.to_dict())
 
-    with open(SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump({"sessions": sessions}, f, indent=2, ensure_ascii=False)
+def save_session(session: StudySession) -> None:
+    """Append a session to file (one JSON object per line)."""
+    record = _json_line(session.to_dict())
+    with _CACHE_LOCK:
+        previous = _CACHE["signature"]
+        cache_fresh = previous == _current_signature()
+        # A single write(2) on an O_APPEND descriptor: the record lands whole at
+        # the end of the file even if another process (CLI or an API worker)
+        # appends at the same time.
+        fd = os.open(SESSIONS_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, record)
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+
+        if not cache_fresh:
+            return
+        previous_size = previous[1] if previous else 0
+        if st.st_size != previous_size + len(record):
+            # Someone else appended around our write; re-parse on next load
+            # rather than adopt a signature covering records we never read
+            _CACHE.update(signature=None, sessions=[], start_times=[], ordered=True)
+            return
+
+        # Keep the cache in step with our own append instead of re-parsing
+        start_times = _CACHE["start_times"]
+        if start_times and session.start_time < start_times[-1]:
+            _CACHE["ordered"] = False
+        _CACHE["sessions"] = _CACHE["sessions"] + [session]
+        _CACHE["start_times"] = start_times + [session.start_time]
+        _CACHE["signature"] = (st.st_mtime_ns, st.st_size)
 
 
 # ============================================================================
 # PHASE 2: DETECTION ENGINES
 # ============================================================================
 
+def _keyword_pattern(keywords) -> "re.Pattern":
+    """Compile keywords into one whole-word regex (a plural 's' is allowed)."""
+    alternation = "|".join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+    return re.compile(rf"\b({alternation})s?\b")
+
+
+_WORD_RE = re.compile(r"\w+")  # Unicode-aware, so non-Latin topics tokenize too
+
+
+@lru_cache(maxsize=256)
+def _topic_tokens(topic: str) -> frozenset:
+    """Lowercased words of a topic; memoized since topics repeat across sessions."""
+    return frozenset(_WORD_RE.findall(topic.lower()))
+
+
+@dataclass
+class NoteFeatures:
+    """Text features of a session's notes, computed once per analysis."""
+    text_lower: str
+    total_words: int
+    per_note_wc: List[int]
+    topic_tokens: frozenset
+    topic_hits: frozenset  # topic tokens found as words (or plurals) in the notes
+    keyword_hits: frozenset  # detector keywords present in the notes
+
+    @classmethod
+    def from_notes(cls, topic: str, notes: List[str]) -> "NoteFeatures":
+        per_note_wc = [len(n.split()) for n in notes]
+        text_lower = " ".join(notes).lower()
+        topic_tokens = _topic_tokens(topic)
+        note_words = set(_WORD_RE.findall(text_lower))
+        return cls(
+            text_lower=text_lower,
+            total_words=sum(per_note_wc),
+            per_note_wc=per_note_wc,
+            topic_tokens=topic_tokens,
+            topic_hits=frozenset(w for w in topic_tokens
+                                 if w in note_words or w + "s" in note_words),
+            keyword_hits=frozenset(_LEXICON_PATTERN.findall(text_lower))
+        )
+
+
 class TopicDriftDetector:
     """
     Detects when notes don't match the stated study topic.
@@ -161,8 +472,17 @@ class TopicDriftDetector:
                     "pronunciation", "conjugation", "tense", "phrase"],
     }
 
+    # Words suggesting vague, unspecific notes
+    VAGUE_INDICATORS = ["stuff", "things", "something", "whatever", "etc",
+                        "and more", "basically", "pretty much", "kind of"]
+
+    _SUBJECT_SETS = {subject: frozenset(keywords)
+                     for subject, keywords in SUBJECT_KEYWORDS.items()}
+    _VAGUE_SET = frozenset(VAGUE_INDICATORS)
+
     @classmethod
-    def detect(cls, topic: str, notes: List[str], relevance_score: float) -> dict:
+    def detect(cls, topic: str, notes: List[str], relevance_score: float,
+               features: Optional[NoteFeatures] = None) -> dict:
         """
         Detect topic drift.
         Returns: {detected: bool, details: str, severity: str}
@@ -174,25 +494,18 @@ class TopicDriftDetector:
                 "severity": "high"
             }
 
-        notes_text = " ".join(notes).lower()
+        features = features or NoteFeatures.from_notes(topic, notes)
         topic_lower = topic.lower()
 
-        # Check 1: Direct topic mention
-        topic_words = set(topic_lower.split()) - {"the", "a", "an", "and", "or", "of", "in", "to"}
-        topic_mentions = sum(1 for w in topic_words if w in notes_text)
-        topic_mention_ratio = topic_mentions / len(topic_words) if topic_words else 0
-
-        # Check 2: Subject area alignment
+        # Check 1: Subject area alignment
         detected_subjects = []
-        for subject, keywords in cls.SUBJECT_KEYWORDS.items():
-            matches = sum(1 for kw in keywords if kw in notes_text)
+        for subject, keywords in cls._SUBJECT_SETS.items():
+            matches = len(features.keyword_hits & keywords)
             if matches >= 2:
                 detected_subjects.append((subject, matches))
 
-        # Check 3: Note specificity (vague notes = possible drift)
-        vague_indicators = ["stuff", "things", "something", "whatever", "etc",
-                           "and more", "basically", "pretty much", "kind of"]
-        vague_count = sum(1 for v in vague_indicators if v in notes_text)
+        # Check 2: Note specificity (vague notes = possible drift)
+        vague_count = len(features.keyword_hits & cls._VAGUE_SET)
 
         # Decision logic
         drift_detected = False
@@ -249,9 +562,13 @@ class OverconfidenceDetector:
         "example", "such as", "specifically"
     ]
 
+    _PASSIVE_SET = frozenset(PASSIVE_PATTERNS)
+    _ACTIVE_SET = frozenset(ACTIVE_PATTERNS)
+
     @classmethod
     def detect(cls, topic: str, notes: List[str],
-               actual_minutes: float, planned_minutes: int) -> dict:
+               actual_minutes: float, planned_minutes: int,
+               features: Optional[NoteFeatures] = None) -> dict:
         """
         Detect overconfidence (consumption without retention).
         Returns: {detected: bool, details: str, confidence_gap: float}
@@ -263,13 +580,13 @@ class OverconfidenceDetector:
                 "confidence_gap": 1.0
             }
 
-        notes_text = " ".join(notes).lower()
-        avg_note_length = sum(len(n.split()) for n in notes) / len(notes)
-        total_words = sum(len(n.split()) for n in notes)
+        features = features or NoteFeatures.from_notes(topic, notes)
+        total_words = features.total_words
+        avg_note_length = total_words / len(notes)
 
         # Check 1: Passive vs Active language ratio
-        passive_count = sum(1 for p in cls.PASSIVE_PATTERNS if p in notes_text)
-        active_count = sum(1 for a in cls.ACTIVE_PATTERNS if a in notes_text)
+        passive_count = len(features.keyword_hits & cls._PASSIVE_SET)
+        active_count = len(features.keyword_hits & cls._ACTIVE_SET)
 
         # Check 2: Note depth vs time spent
         # Heuristic: ~5-10 meaningful words per 5 minutes of study is healthy
@@ -317,6 +634,16 @@ class OverconfidenceDetector:
         }
 
 
+# All detector keywords in one whole-word pattern, so NoteFeatures finds
+# every keyword in a single scan of the notes instead of one scan per group
+_LEXICON_PATTERN = _keyword_pattern(
+    [kw for keywords in TopicDriftDetector.SUBJECT_KEYWORDS.values() for kw in keywords]
+    + TopicDriftDetector.VAGUE_INDICATORS
+    + OverconfidenceDetector.PASSIVE_PATTERNS
+    + OverconfidenceDetector.ACTIVE_PATTERNS
+)
+
+
 class RevisionTaskGenerator:
     """
     Generates actionable revision tasks based on session analysis.
@@ -325,7 +652,8 @@ class RevisionTaskGenerator:
     @classmethod
     def generate(cls, topic: str, notes: List[str],
                  drift_detected: bool, overconfidence_detected: bool,
-                 relevance_score: float) -> List[str]:
+                 relevance_score: float,
+                 features: Optional[NoteFeatures] = None) -> List[str]:
         """Generate 2-4 specific revision tasks."""
         tasks = []
 
@@ -342,8 +670,10 @@ class RevisionTaskGenerator:
         # Task 3: Based on note quality
         if notes:
             # Find the shortest note - likely needs expansion
-            shortest = min(notes, key=lambda n: len(n.split()))
-            if len(shortest.split()) < 8:
+            word_counts = (features or NoteFeatures.from_notes(topic, notes)).per_note_wc
+            shortest_wc = min(word_counts)
+            shortest = notes[word_counts.index(shortest_wc)]
+            if shortest_wc < 8:
                 tasks.append(f"Expand on: '{shortest[:50]}...' - add examples")
 
         # Task 4: Active recall
@@ -357,58 +687,6 @@ class RevisionTaskGenerator:
         # Limit to 4 tasks
         return tasks[:4] if tasks else ["Review your notes and add one new insight"]
 
-    @classmethod
-    def generate_with_claude(cls, topic: str, notes: List[str],
-                            drift_info: dict, overconfidence_info: dict) -> List[str]:
-        """Use Claude to generate more intelligent revision tasks."""
-        if not ANTHROPIC_API_KEY:
-            return cls.generate(
-                topic, notes,
-                drift_info.get("detected", False),
-                overconfidence_info.get("detected", False),
-                50  # default relevance
-            )
-
-        try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
-            notes_text = "\n".join(f"- {note}" for note in notes)
-
-            prompt = f"""Based on this study session, generate 3-4 specific revision tasks.
-
-TOPIC: {topic}
-
-STUDENT'S NOTES:
-{notes_text}
-
-ISSUES DETECTED:
-- Topic drift: {drift_info.get('details', 'None')}
-- Overconfidence: {overconfidence_info.get('details', 'None')}
-
-Generate 3-4 SHORT, SPECIFIC revision tasks that will help this student actually learn the material.
-Tasks should be actionable (start with a verb) and completable in 5-15 minutes each.
-
-Respond as a JSON array of strings:
-["task 1", "task 2", "task 3"]"""
-
-            message = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            response_text = message.content[0].text
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())[:4]
-
-        except Exception:
-            pass
-
-        return cls.generate(topic, notes, drift_info.get("detected", False),
-                          overconfidence_info.get("detected", False), 50)
-
 
 class NextSessionPlanner:
     """
@@ -424,11 +702,6 @@ class NextSessionPlanner:
         overconfidence = current_session.get("overconfidence_detected", False)
         actual_mins = current_session.get("actual_minutes", 0)
 
-        # Check topic history
-        topic_sessions = [s for s in all_sessions
-                         if topic.lower() in s.topic.lower()]
-        times_studied = len(topic_sessions)
-
         # Decision logic
         if drift or relevance < 50:
             return (f"Restart '{topic}' with focused 15-min session. "
@@ -438,7 +711,11 @@ class NextSessionPlanner:
             return (f"Begin with a 5-min recall test on '{topic}' (no notes). "
                    f"Then fill gaps with targeted review.")
 
-        elif times_studied >= 3 and relevance >= 70:
+        # Topic history is only needed from here on, so the scan over all
+        # sessions is skipped for drifting or overconfident sessions
+        times_studied = cls._times_studied(topic, all_sessions) if relevance >= 70 else 0
+
+        if times_studied >= 3 and relevance >= 70:
             return (f"You've studied '{topic}' {times_studied} times. "
                    f"Try practice problems or teach the concept to solidify.")
 
@@ -454,16 +731,37 @@ class NextSessionPlanner:
             return (f"Continue with '{topic}'. Focus on understanding 'why' "
                    f"not just 'what'. Add more examples to your notes.")
 
+    @staticmethod
+    def _times_studied(topic: str, all_sessions: List[StudySession]) -> int:
+        """Count past sessions whose topic contains this one (case-insensitive)."""
+        topic_lower = topic.lower()
+        return sum(1 for s in all_sessions if topic_lower in s.topic_lower)
+
 
 # ============================================================================
 # AI ENGINE (Phase 1 + Phase 2)
 # ============================================================================
 
+def _claude_session_key(topic: str, notes: Tuple[str, ...], planned_mins: int,
+                        actual_mins: float, break_count: int,
+                        overconfidence_details: str) -> tuple:
+    """Disk cache key for AIEngine._claude_session.
+
+    Case and surrounding whitespace don't change the analysis, and the
+    prompt only shows whole minutes, so those are normalized away.
+    """
+    return (topic.strip().lower(), [n.strip() for n in notes], planned_mins,
+            round(actual_mins), break_count, overconfidence_details)
+
+
 class AIEngine:
     """
     AI-powered analysis with Phase 1 basics and Phase 2 detection.
     """
 
+    # Topic words ignored when scoring relevance locally
+    _STOPWORDS = frozenset({"the", "a", "an", "and", "or", "to", "of"})
+
     @classmethod
     def full_analysis(cls, topic: str, notes: List[str],
                      planned_mins: int, actual_mins: float,
@@ -472,27 +770,29 @@ class AIEngine:
         """
         Complete analysis including Phase 1 + Phase 2 features.
         """
-        # Phase 1: Basic analysis
+        features = NoteFeatures.from_notes(topic, notes)
+
+        # Phase 2: Overconfidence only needs the notes and timing, so it is
+        # known before the Claude call and can inform its revision tasks
+        overconfidence_info = OverconfidenceDetector.detect(
+            topic, notes, actual_mins, planned_mins, features
+        )
+
+        # Phase 1: Basic analysis (plus revision tasks when Claude answers)
         basic = cls._analyze_basic(
             topic, notes, planned_mins, actual_mins,
-            break_count, total_break_secs
+            break_count, total_break_secs, overconfidence_info, features
         )
 
         # Phase 2: Detection
         drift_info = TopicDriftDetector.detect(
-            topic, notes, basic["topic_relevance"]
-        )
-
-        overconfidence_info = OverconfidenceDetector.detect(
-            topic, notes, actual_mins, planned_mins
+            topic, notes, basic["topic_relevance"], features
         )
 
         # Phase 2: Revision tasks
-        revision_tasks = RevisionTaskGenerator.generate_with_claude(
-            topic, notes, drift_info, overconfidence_info
-        ) if ANTHROPIC_API_KEY else RevisionTaskGenerator.generate(
+        revision_tasks = basic.get("revision_tasks") or RevisionTaskGenerator.generate(
             topic, notes, drift_info["detected"],
-            overconfidence_info["detected"], basic["topic_relevance"]
+            overconfidence_info["detected"], basic["topic_relevance"], features
         )
 
         # Phase 2: Next session plan
@@ -521,73 +821,111 @@ class AIEngine:
     @classmethod
     def _analyze_basic(cls, topic: str, notes: List[str],
                       planned_mins: int, actual_mins: float,
-                      break_count: int, total_break_secs: int) -> dict:
+                      break_count: int, total_break_secs: int,
+                      overconfidence_info: dict,
+                      features: Optional[NoteFeatures] = None) -> dict:
         """Phase 1 basic analysis."""
 
         if ANTHROPIC_API_KEY:
             return cls._analyze_with_claude(
                 topic, notes, planned_mins, actual_mins,
-                break_count, total_break_secs
+                break_count, total_break_secs, overconfidence_info
             )
         else:
             return cls._analyze_locally(
                 topic, notes, planned_mins, actual_mins,
-                break_count, total_break_secs
+                break_count, total_break_secs, features
             )
 
     @classmethod
     def _analyze_with_claude(cls, topic: str, notes: List[str],
                             planned_mins: int, actual_mins: float,
-                            break_count: int, total_break_secs: int) -> dict:
-        """Use Claude API for basic analysis."""
+                            break_count: int, total_break_secs: int,
+                            overconfidence_info: dict) -> dict:
+        """Use Claude API for basic analysis and revision tasks in one call."""
         try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+            summary, relevance, feedback, tasks = cls._claude_session(
+                topic, tuple(notes), planned_mins, actual_mins, break_count,
+                overconfidence_info.get("details") or "None"
+            )
+            return {
+                "summary": summary,
+                "topic_relevance": relevance,
+                "focus_feedback": feedback,
+                "revision_tasks": list(tasks)
+            }
+        except Exception as e:
+            print(f"\n  ⚠️  API error: {e}")
+
+        return cls._analyze_locally(topic, notes, planned_mins, actual_mins,
+                                   break_count, total_break_secs)
 
-            notes_text = "\n".join(f"- {note}" for note in notes)
+    @staticmethod
+    @lru_cache(maxsize=512)
+    @_disk_cached(key=_claude_session_key)
+    def _claude_session(topic: str, notes: Tuple[str, ...], planned_mins: int,
+                        actual_mins: float, break_count: int,
+                        overconfidence_details: str) -> Tuple[str, float, str, Tuple[str, ...]]:
+        """
+        Ask Claude for (summary, relevance, feedback, revision tasks).
+
+        One round-trip covers everything Claude contributes to a session;
+        the static instructions go in CLAUDE_SYSTEM_PROMPT, marked for
+        prompt caching, and only the session itself varies per call.
+        Memoized in memory and on disk, the latter on the normalized
+        inputs (see _claude_session_key), so repeated previews of the same
+        notes don't pay for another round-trip, even after a restart.
+        Claude itself sees the inputs exactly as given. Failures raise instead of
+        returning a fallback, which keeps them out of the cache.
+        """
+        client = _claude_client()
 
-            prompt = f"""Analyze this study session briefly.
+        notes_text = "\n".join(f"- {note}" for note in notes)
 
-TOPIC: {topic}
+        prompt = f"""TOPIC: {topic}
 NOTES:
 {notes_text}
 STATS: {actual_mins:.0f}/{planned_mins} min, {break_count} breaks
+OVERCONFIDENCE: {overconfidence_details}"""
+
+        message = client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=700,
+            system=[{
+                "type": "text",
+                "text": CLAUDE_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            tools=[SESSION_REPORT_TOOL],
+            tool_choice={"type": "tool", "name": SESSION_REPORT_TOOL["name"]},
+            messages=[{"role": "user", "content": prompt}]
+        )
 
-Provide:
-1. SUMMARY (2 sentences): What did they learn?
-2. TOPIC_RELEVANCE (0-100): How well do notes match the topic?
-3. FOCUS_FEEDBACK (2 sentences): Constructive feedback.
-
-JSON format:
-{{"summary": "...", "topic_relevance": <number>, "focus_feedback": "..."}}"""
-
-            message = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=400,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            response_text = message.content[0].text
-            json_match = re.search(r'\{[^{}]*\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                return {
-                    "summary": result.get("summary", ""),
-                    "topic_relevance": float(result.get("topic_relevance", 50)),
-                    "focus_feedback": result.get("focus_feedback", "")
-                }
+        result = next((block.input for block in message.content
+                       if block.type == "tool_use"), None)
+        if result is None:
+            raise ValueError("no session_report in Claude response")
 
-        except Exception as e:
-            print(f"\n  ⚠️  API error: {e}")
+        return (
+            result.get("summary", ""),
+            float(result.get("topic_relevance", 50)),
+            result.get("focus_feedback", ""),
+            tuple(result.get("revision_tasks", ())[:4])
+        )
 
-        return cls._analyze_locally(topic, notes, planned_mins, actual_mins,
-                                   break_count, total_break_secs)
+    @staticmethod
+    def clear_cache() -> None:
+        """Forget all memoized Claude responses, in memory and on disk."""
+        AIEngine._claude_session.cache_clear()
+        shutil.rmtree(CLAUDE_CACHE_DIR, ignore_errors=True)
 
     @classmethod
     def _analyze_locally(cls, topic: str, notes: List[str],
                         planned_mins: int, actual_mins: float,
-                        break_count: int, total_break_secs: int) -> dict:
+                        break_count: int, total_break_secs: int,
+                        features: Optional[NoteFeatures] = None) -> dict:
         """Local rule-based analysis."""
+        features = features or NoteFeatures.from_notes(topic, notes)
 
         # Summary
         if notes:
@@ -597,16 +935,15 @@ JSON format:
             summary = "No notes recorded."
 
         # Topic relevance
-        topic_words = set(topic.lower().split()) - {"the", "a", "an", "and", "or", "to", "of"}
-        notes_text = " ".join(notes).lower()
+        topic_words = features.topic_tokens - cls._STOPWORDS
 
         if topic_words:
-            matches = sum(1 for w in topic_words if w in notes_text)
+            matches = len(topic_words & features.topic_hits)
             base = (matches / len(topic_words)) * 100
         else:
             base = 50
 
-        avg_len = sum(len(n.split()) for n in notes) / len(notes) if notes else 0
+        avg_len = features.total_words / len(notes) if notes else 0
         topic_relevance = min(100, base + min(20, avg_len))
 
         # Focus feedback
@@ -639,15 +976,26 @@ JSON format:
 class StudyTimer:
     """Focus timer with break tracking."""
 
+    # Every possible 30-cell progress bar, indexed by filled cells
+    _BARS = tuple("█" * i + "░" * (30 - i) for i in range(31))
+
     def __init__(self, duration_minutes: int):
         self.duration_seconds = duration_minutes * 60
         self.remaining = self.duration_seconds
-        self.breaks: List[Break] = []
+        self.breaks: List[dict] = []  # Break fields, stored as plain dicts
         self.is_paused = False
         self.current_break_start = None
-
-    def run(self) -> tuple[float, List[dict], bool]:
-        start_time = time.time()
+        # Monotonic clock readings, so sleep overhead and wall-clock
+        # adjustments (NTP, DST) never skew the countdown
+        self._start_mono = 0.0
+        self._break_start_mono = 0.0
+        self._break_accum = 0.0
+        self._get_key = self._setup_key_detection()
+        self._status_line = None
+
+    def run(self) -> tuple[float, List[dict], bool, int]:
+        """Run the countdown; returns (study minutes, breaks, completed, break seconds)."""
+        self._start_mono = time.monotonic()
 
         print("\n" + "═" * 50)
         print("  🎯 FOCUS SESSION STARTED")
@@ -655,73 +1003,133 @@ class StudyTimer:
         print("\n  [b] Break  [r] Resume  [q] Quit")
         print("─" * 50)
 
-        get_key = self._setup_key_detection()
+        get_key = self._get_key
 
+        # Waiting for a key doubles as the tick: get_key returns as soon as
+        # one is pressed, or when the displayed second next changes, so the
+        # loop wakes once per second and stays aligned after a key press.
         while self.remaining > 0:
             if not self.is_paused:
                 self._display_timer()
-                time.sleep(1)
-                self.remaining -= 1
+                left = self._seconds_left()
+                key = get_key(min(left, left - math.ceil(left) + 1))
+                self.remaining = math.ceil(self._seconds_left())
             else:
                 self._display_break()
-                time.sleep(0.5)
+                on_break = time.monotonic() - self._break_start_mono
+                key = get_key(1 - on_break % 1)
 
-            key = get_key()
             self._handle_key(key)
 
             if key == 'q':
                 break
 
-        end_time = time.time()
-        total_break_secs = sum(b.duration_seconds for b in self.breaks)
-        actual_study_secs = (end_time - start_time) - total_break_secs
+        actual_study_secs = (time.monotonic() - self._start_mono) - self._break_accum
         completed = self.remaining <= 0
 
         print("\n\n  " + ("✅ Complete!" if completed else "⏹️ Ended early"))
 
-        return actual_study_secs / 60, [asdict(b) for b in self.breaks], completed
+        total_break_secs = sum(b["duration_seconds"] for b in self.breaks)
+        return actual_study_secs / 60, self.breaks, completed, total_break_secs
+
+    def _seconds_left(self) -> float:
+        """Study seconds left, derived from the clock rather than tick counts."""
+        studied = time.monotonic() - self._start_mono - self._break_accum
+        return max(0.0, self.duration_seconds - studied)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _setup_key_detection():
+        """
+        Return get_key(timeout): the next key pressed, or None after timeout seconds.
 
-    def _setup_key_detection(self):
+        The platform is probed once per process; later timers reuse the reader.
+        """
         try:
             import msvcrt
-            def get_key():
-                if msvcrt.kbhit():
-                    return msvcrt.getch().decode('utf-8', errors='ignore').lower()
-                return None
+            wait_for_input = StudyTimer._windows_input_waiter()
+            def get_key(timeout):
+                deadline = time.monotonic() + timeout
+                while True:
+                    if msvcrt.kbhit():
+                        return msvcrt.getch().decode('utf-8', errors='ignore').lower()
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        return None
+                    if wait_for_input(left) and not msvcrt.kbhit():
+                        # Signalled by a non-key console event (mouse, focus)
+                        time.sleep(min(0.05, left))
             return get_key
         except ImportError:
-            import sys, select
-            def get_key():
-                if select.select([sys.stdin], [], [], 0)[0]:
+            import select
+            def get_key(timeout):
+                # select() sleeps in the kernel until stdin is readable
+                if select.select([sys.stdin], [], [], timeout)[0]:
                     return sys.stdin.read(1).lower()
                 return None
             return get_key
 
+    @staticmethod
+    def _windows_input_waiter():
+        """
+        Return wait(seconds) -> bool that blocks until console input arrives.
+
+        Uses WaitForSingleObject on the stdin handle so the wait happens in
+        the kernel. When stdin isn't a console (e.g. redirected), falls back
+        to a short sleep so callers keep polling kbhit().
+        """
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-10)  # STD_INPUT_HANDLE
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(wintypes.DWORD())):
+            def poll_wait(seconds):
+                time.sleep(min(0.05, seconds))
+                return False
+            return poll_wait
+
+        def wait(seconds):
+            return kernel32.WaitForSingleObject(handle, int(seconds * 1000)) == 0  # WAIT_OBJECT_0
+        return wait
+
     def _display_timer(self):
         mins, secs = divmod(self.remaining, 60)
         progress = (self.duration_seconds - self.remaining) / self.duration_seconds
-        filled = int(30 * progress)
-        bar = "█" * filled + "░" * (30 - filled)
-        print(f"\r  🔥 [{bar}] {mins:02d}:{secs:02d}  ", end="", flush=True)
+        bar = self._BARS[int(30 * progress)]
+        self._write_status(f"\r  🔥 [{bar}] {mins:02d}:{secs:02d}  ")
 
     def _display_break(self):
         if self.current_break_start:
-            dur = int(time.time() - self.current_break_start)
+            dur = int(time.monotonic() - self._break_start_mono)
             mins, secs = divmod(dur, 60)
-            print(f"\r  ☕ BREAK: {mins:02d}:{secs:02d} [r]=resume  ", end="", flush=True)
+            self._write_status(f"\r  ☕ BREAK: {mins:02d}:{secs:02d} [r]=resume  ")
+
+    def _write_status(self, line: str):
+        """Redraw the status line, skipping the write if nothing changed."""
+        if line == self._status_line:
+            return
+        sys.stdout.write(line)
+        sys.stdout.flush()
+        self._status_line = line
 
     def _handle_key(self, key):
+        if key in ('b', 'r'):
+            self._status_line = None  # messages below move the cursor; redraw next tick
         if key == 'b' and not self.is_paused:
             self.is_paused = True
             self.current_break_start = time.time()
+            self._break_start_mono = time.monotonic()
             print("\n\n  ☕ Break started\n")
         elif key == 'r' and self.is_paused and self.current_break_start:
-            duration = int(time.time() - self.current_break_start)
-            self.breaks.append(Break(
-                datetime.fromtimestamp(self.current_break_start).isoformat(),
-                datetime.now().isoformat(),
-                duration
-            ))
+            elapsed = time.monotonic() - self._break_start_mono
+            self._break_accum += elapsed
+            duration = int(elapsed)
+            self.breaks.append({
+                "start_time": datetime.fromtimestamp(self.current_break_start).isoformat(),
+                "end_time": datetime.now().isoformat(),
+                "duration_seconds": duration
+            })
             self.is_paused = False
             self.current_break_start = None
             print(f"\n\n  ▶️ Resumed ({duration//60}m {duration%60}s break)\n")
@@ -756,6 +1164,31 @@ def collect_notes(topic: str) -> List[str]:
 # SESSION DISPLAY (Phase 1 + Phase 2)
 # ============================================================================
 
+def _buffered_output(func):
+    """
+    Collect everything a display function prints and write it in one go.
+
+    A screen is dozens of print() calls, each a separate write to the
+    terminal; buffering them keeps redraws quick on slow or remote ttys.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with redirect_stdout(buf):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+
+# Shared wrappers; textwrap.wrap() builds a new TextWrapper on every call
+_WRAP_46 = textwrap.TextWrapper(width=46)
+_WRAP_44 = textwrap.TextWrapper(width=44)
+
+
+@_buffered_output
 def display_analysis(session: StudySession):
     """Display complete AI analysis."""
     print("\n" + "═" * 50)
@@ -764,7 +1197,7 @@ def display_analysis(session: StudySession):
 
     # Summary
     print("\n  📋 SUMMARY:")
-    for line in textwrap.wrap(session.ai_summary, 46):
+    for line in _WRAP_46.wrap(session.ai_summary):
         print(f"     {line}")
 
     # Topic Relevance
@@ -779,18 +1212,18 @@ def display_analysis(session: StudySession):
     # Phase 2: Topic Drift Warning
     if session.topic_drift_detected:
         print("\n  ⚠️  TOPIC DRIFT DETECTED:")
-        for line in textwrap.wrap(session.drift_details, 44):
+        for line in _WRAP_44.wrap(session.drift_details):
             print(f"     {line}")
 
     # Phase 2: Overconfidence Warning
     if session.overconfidence_detected:
         print("\n  ⚠️  OVERCONFIDENCE WARNING:")
-        for line in textwrap.wrap(session.overconfidence_details, 44):
+        for line in _WRAP_44.wrap(session.overconfidence_details):
             print(f"     {line}")
 
     # Focus Feedback
     print("\n  💡 FOCUS FEEDBACK:")
-    for line in textwrap.wrap(session.focus_feedback, 46):
+    for line in _WRAP_46.wrap(session.focus_feedback):
         print(f"     {line}")
 
     # Stats
@@ -815,10 +1248,11 @@ def display_analysis(session: StudySession):
         print("\n" + "═" * 50)
         print("  📅 NEXT SESSION")
         print("═" * 50)
-        for line in textwrap.wrap(session.next_session_plan, 46):
+        for line in _WRAP_46.wrap(session.next_session_plan):
             print(f"\n     {line}")
 
 
+@_buffered_output
 def display_history():
     """Display session history."""
     sessions = load_sessions()
@@ -867,27 +1301,27 @@ class CLIChart:
         if max_value <= 0:
             filled = 0
         else:
-            filled = int((value / max_value) * width)
+            # Clamp so values outside [0, max_value] can't stretch the bar
+            filled = min(width, max(0, int((value / max_value) * width)))
         bar = fill * filled + empty * (width - filled)
         return f"  {label:<12} [{bar}] {value:.0f}"
 
+    SPARK_CHARS = " ▁▂▃▄▅▆▇█"
+
     @staticmethod
     def sparkline(values: List[float], width: int = 7) -> str:
         """Create a mini sparkline from values."""
         if not values:
             return "─" * width
 
-        chars = " ▁▂▃▄▅▆▇█"
+        chars = CLIChart.SPARK_CHARS
         min_val = min(values)
         max_val = max(values)
         range_val = max_val - min_val if max_val != min_val else 1
+        top = len(chars) - 1
 
-        result = ""
-        for v in values[-width:]:
-            idx = int(((v - min_val) / range_val) * (len(chars) - 1))
-            result += chars[idx]
-
-        return result
+        return "".join(chars[int(((v - min_val) / range_val) * top)]
+                       for v in values[-width:])
 
     @staticmethod
     def trend_arrow(current: float, previous: float) -> str:
@@ -911,30 +1345,41 @@ class WeeklyReportGenerator:
         today = datetime.now().date()
         week_start = today - timedelta(days=today.weekday())  # Monday
         week_end = week_start + timedelta(days=6)
+        last_week_start = week_start - timedelta(days=7)
 
-        # Filter sessions for this week and last week
+        # One pass over the full history: split out this week and last
+        # week, and collect the study days the streak needs
         this_week = []
         last_week = []
+        study_days = set()
 
         for s in sessions:
-            session_date = datetime.fromisoformat(s.start_time).date()
+            session_date = s.start_date
+            study_days.add(session_date)
+            if session_date < last_week_start:
+                continue
             if week_start <= session_date <= week_end:
                 this_week.append(s)
-            elif week_start - timedelta(days=7) <= session_date < week_start:
+            elif session_date < week_start:
                 last_week.append(s)
 
+        overview = cls._calculate_overview(this_week, last_week)
+        by_topic = defaultdict(list)
+        for s in this_week:
+            by_topic[s.topic].append(s)
+
         return {
             "period": {
                 "start": week_start.isoformat(),
                 "end": week_end.isoformat()
             },
-            "overview": cls._calculate_overview(this_week, last_week),
+            "overview": overview,
             "daily_breakdown": cls._daily_breakdown(this_week, week_start),
-            "topic_analysis": cls._topic_analysis(this_week),
+            "topic_analysis": cls._topic_analysis(by_topic),
             "time_vs_retention": cls._time_vs_retention(this_week),
-            "problem_areas": cls._identify_problem_areas(this_week),
-            "recommendations": cls._generate_recommendations(this_week, last_week),
-            "streak": cls._calculate_streak(sessions)
+            "problem_areas": cls._identify_problem_areas(by_topic),
+            "recommendations": cls._generate_recommendations(this_week, overview, by_topic),
+            "streak": cls._calculate_streak(study_days)
         }
 
     @classmethod
@@ -965,46 +1410,37 @@ class WeeklyReportGenerator:
     def _daily_breakdown(cls, sessions: List[StudySession],
                         week_start: datetime.date) -> List[dict]:
         """Break down study time by day."""
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        daily = {i: {"day": days[i], "minutes": 0, "sessions": 0, "avg_score": []}
-                for i in range(7)}
+        days = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+        minutes = [0] * 7
+        counts = [0] * 7
+        score_sums = [0] * 7
 
         for s in sessions:
-            day_idx = datetime.fromisoformat(s.start_time).weekday()
-            daily[day_idx]["minutes"] += s.actual_minutes
-            daily[day_idx]["sessions"] += 1
-            daily[day_idx]["avg_score"].append(s.topic_relevance_score)
-
-        # Calculate averages
-        for d in daily.values():
-            d["avg_score"] = sum(d["avg_score"]) / len(d["avg_score"]) if d["avg_score"] else 0
-
-        return list(daily.values())
+            day_idx = s.start_date.weekday()
+            minutes[day_idx] += s.actual_minutes
+            counts[day_idx] += 1
+            score_sums[day_idx] += s.topic_relevance_score
+
+        return [{
+            "day": days[i],
+            "minutes": minutes[i],
+            "sessions": counts[i],
+            "avg_score": score_sums[i] / counts[i] if counts[i] else 0
+        } for i in range(7)]
 
     @classmethod
-    def _topic_analysis(cls, sessions: List[StudySession]) -> List[dict]:
+    def _topic_analysis(cls, by_topic: Dict[str, List[StudySession]]) -> List[dict]:
         """Analyze performance by topic."""
-        topics = defaultdict(lambda: {
-            "time": 0, "sessions": 0, "scores": [], "issues": 0
-        })
-
-        for s in sessions:
-            t = topics[s.topic]
-            t["time"] += s.actual_minutes
-            t["sessions"] += 1
-            t["scores"].append(s.topic_relevance_score)
-            if s.topic_drift_detected or s.overconfidence_detected:
-                t["issues"] += 1
-
         result = []
-        for topic, data in topics.items():
-            avg_score = sum(data["scores"]) / len(data["scores"]) if data["scores"] else 0
+        for topic, topic_sessions in by_topic.items():
+            avg_score = sum(s.topic_relevance_score for s in topic_sessions) / len(topic_sessions)
             result.append({
                 "topic": topic,
-                "time": data["time"],
-                "sessions": data["sessions"],
+                "time": sum(s.actual_minutes for s in topic_sessions),
+                "sessions": len(topic_sessions),
                 "avg_score": avg_score,
-                "issues": data["issues"],
+                "issues": sum(1 for s in topic_sessions
+                              if s.topic_drift_detected or s.overconfidence_detected),
                 "understanding": "good" if avg_score >= 70 else "medium" if avg_score >= 50 else "low"
             })
 
@@ -1016,35 +1452,35 @@ class WeeklyReportGenerator:
         if not sessions:
             return {"correlation": "insufficient_data", "insight": "Need more sessions"}
 
-        # Group by time buckets
-        short = [s for s in sessions if s.actual_minutes < 20]
-        medium = [s for s in sessions if 20 <= s.actual_minutes < 40]
-        long = [s for s in sessions if s.actual_minutes >= 40]
+        # One pass fills both the short/medium/long groups (<20, 20-40,
+        # 40+ min) and the 10-minute buckets for the optimal duration
+        groups = ([], [], [])
+        duration_scores = defaultdict(list)
+        for s in sessions:
+            minutes = s.actual_minutes
+            score = s.topic_relevance_score
+            groups[(minutes >= 20) + (minutes >= 40)].append(score)
+            duration_scores[(int(minutes) // 10) * 10].append(score)
 
-        def avg_score(session_list):
-            if not session_list:
-                return 0
-            return sum(s.topic_relevance_score for s in session_list) / len(session_list)
+        def summary(scores):
+            avg = sum(scores) / len(scores) if scores else 0
+            return {"count": len(scores), "avg_score": avg}
 
         return {
-            "short_sessions": {"count": len(short), "avg_score": avg_score(short)},
-            "medium_sessions": {"count": len(medium), "avg_score": avg_score(medium)},
-            "long_sessions": {"count": len(long), "avg_score": avg_score(long)},
-            "optimal_duration": cls._find_optimal_duration(sessions)
+            "short_sessions": summary(groups[0]),
+            "medium_sessions": summary(groups[1]),
+            "long_sessions": summary(groups[2]),
+            "optimal_duration": cls._find_optimal_duration(duration_scores, len(sessions))
         }
 
     @classmethod
-    def _find_optimal_duration(cls, sessions: List[StudySession]) -> str:
-        """Find the optimal session duration based on scores."""
-        if len(sessions) < 3:
+    def _find_optimal_duration(cls, duration_scores: Dict[int, List[float]],
+                               session_count: int) -> str:
+        """Find the optimal session duration from scores per 10-minute bucket."""
+        if session_count < 3:
             return "Need more data"
 
         # Find duration with highest average score
-        duration_scores = defaultdict(list)
-        for s in sessions:
-            bucket = (int(s.actual_minutes) // 10) * 10
-            duration_scores[bucket].append(s.topic_relevance_score)
-
         best_bucket = 25
         best_score = 0
         for bucket, scores in duration_scores.items():
@@ -1057,16 +1493,11 @@ class WeeklyReportGenerator:
         return f"{best_bucket}-{best_bucket + 10} minutes"
 
     @classmethod
-    def _identify_problem_areas(cls, sessions: List[StudySession]) -> List[dict]:
+    def _identify_problem_areas(cls, by_topic: Dict[str, List[StudySession]]) -> List[dict]:
         """Identify topics/patterns that need attention."""
         problems = []
 
-        # Group by topic
-        topic_data = defaultdict(list)
-        for s in sessions:
-            topic_data[s.topic].append(s)
-
-        for topic, topic_sessions in topic_data.items():
+        for topic, topic_sessions in by_topic.items():
             issues = []
 
             # Low average score
@@ -1095,16 +1526,16 @@ class WeeklyReportGenerator:
         return sorted(problems, key=lambda x: len(x["issues"]), reverse=True)
 
     @classmethod
-    def _generate_recommendations(cls, this_week: List[StudySession],
-                                  last_week: List[StudySession]) -> List[str]:
+    def _generate_recommendations(cls, this_week: List[StudySession], overview: dict,
+                                  by_topic: Dict[str, List[StudySession]]) -> List[str]:
         """Generate actionable weekly recommendations."""
         recommendations = []
 
         if not this_week:
             return ["Start tracking your study sessions to get personalized recommendations!"]
 
-        this_time = sum(s.actual_minutes for s in this_week)
-        last_time = sum(s.actual_minutes for s in last_week) if last_week else 0
+        this_time = overview["this_week"]["time"]
+        last_time = overview["last_week"]["time"]
 
         # Time-based recommendations
         if this_time < 120:  # Less than 2 hours
@@ -1117,28 +1548,29 @@ class WeeklyReportGenerator:
             )
 
         # Quality-based recommendations
-        avg_score = sum(s.topic_relevance_score for s in this_week) / len(this_week)
-        if avg_score < 60:
+        if overview["this_week"]["avg_relevance"] < 60:
             recommendations.append(
                 "🎯 Focus quality is low. Try the Pomodoro technique (25 min focused + 5 min break)."
             )
 
         # Issue-based recommendations
-        drift_count = sum(1 for s in this_week if s.topic_drift_detected)
+        drift_count = overconf_count = 0
+        for s in this_week:
+            drift_count += s.topic_drift_detected
+            overconf_count += s.overconfidence_detected
+
         if drift_count > len(this_week) * 0.3:
             recommendations.append(
                 "📍 Topic drift detected often. Write your learning goal before each session."
             )
 
-        overconf_count = sum(1 for s in this_week if s.overconfidence_detected)
         if overconf_count > len(this_week) * 0.3:
             recommendations.append(
                 "💭 Passive learning detected. Add more 'why' and 'how' to your notes."
             )
 
         # Topic variety
-        topics = set(s.topic for s in this_week)
-        if len(topics) == 1 and len(this_week) > 3:
+        if len(by_topic) == 1 and len(this_week) > 3:
             recommendations.append(
                 "📚 Consider varying your topics. Interleaved practice improves retention."
             )
@@ -1146,42 +1578,49 @@ class WeeklyReportGenerator:
         return recommendations[:4] if recommendations else ["Keep up the good work! 🌟"]
 
     @classmethod
-    def _calculate_streak(cls, all_sessions: List[StudySession]) -> dict:
-        """Calculate current and longest study streak."""
-        if not all_sessions:
+    def _calculate_streak(cls, study_days: set) -> dict:
+        """Calculate current and longest study streak from the days studied."""
+        if not study_days:
             return {"current": 0, "longest": 0}
 
-        dates = sorted(set(
-            datetime.fromisoformat(s.start_time).date()
-            for s in all_sessions
-        ))
+        # Day ordinals compare with plain integer arithmetic, no timedeltas
+        days = sorted(d.toordinal() for d in study_days)
 
-        if not dates:
-            return {"current": 0, "longest": 0}
-
-        streaks = []
-        current = 1
-
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i-1]).days == 1:
-                current += 1
-            else:
-                streaks.append(current)
-                current = 1
-        streaks.append(current)
+        longest = current = 1
+        for prev, day in zip(days, days[1:]):
+            current = current + 1 if day - prev == 1 else 1
+            longest = max(longest, current)
 
         # Check if streak is still active
-        today = datetime.now().date()
-        last_study = dates[-1]
-        active = (today - last_study).days <= 1
+        last_study = date.fromordinal(days[-1])
+        active = datetime.now().date().toordinal() - days[-1] <= 1
 
         return {
             "current": current if active else 0,
-            "longest": max(streaks),
+            "longest": longest,
             "last_study": last_study.isoformat()
         }
 
 
+@lru_cache(maxsize=1)
+def _study_streak_cached(signature: Optional[Tuple[int, int]], today: date) -> dict:
+    """Streak for one sessions-file signature and date; call study_streak() instead."""
+    return WeeklyReportGenerator._calculate_streak(
+        {s.start_date for s in _cached_sessions()}
+    )
+
+
+def study_streak() -> dict:
+    """
+    Current and longest streak over the saved sessions.
+
+    Recomputed only when the sessions file changes or the date rolls over,
+    so menu redraws don't rescan the history. Treat the result as read-only.
+    """
+    return _study_streak_cached(sessions_signature(), date.today())
+
+
+@_buffered_output
 def display_weekly_report():
     """Display the weekly report with visualizations."""
     sessions = load_sessions()
@@ -1292,6 +1731,18 @@ def display_weekly_report():
     print(f"     {grade['message']}")
 
 
+# Lower score bounds for each grade above F, with the grades in the same order
+_GRADE_CUTOFFS = (50, 60, 70, 80, 90)
+_GRADES = (
+    ("F", "Let's restart fresh. Even 15 min/day makes a difference."),
+    ("D", "Room for improvement. Set smaller, achievable goals."),
+    ("C", "Decent effort. Try to increase focus quality."),
+    ("B", "Good progress. A bit more consistency would help."),
+    ("A", "Excellent work! You're building strong habits."),
+    ("A+", "Outstanding week! Keep this momentum!"),
+)
+
+
 def cls_calculate_weekly_grade(stats: dict) -> dict:
     """Calculate an overall weekly grade."""
     score = 0
@@ -1315,18 +1766,7 @@ def cls_calculate_weekly_grade(stats: dict) -> dict:
     score = max(0, score - issue_penalty)
 
     # Determine grade
-    if score >= 90:
-        letter, message = "A+", "Outstanding week! Keep this momentum!"
-    elif score >= 80:
-        letter, message = "A", "Excellent work! You're building strong habits."
-    elif score >= 70:
-        letter, message = "B", "Good progress. A bit more consistency would help."
-    elif score >= 60:
-        letter, message = "C", "Decent effort. Try to increase focus quality."
-    elif score >= 50:
-        letter, message = "D", "Room for improvement. Set smaller, achievable goals."
-    else:
-        letter, message = "F", "Let's restart fresh. Even 15 min/day makes a difference."
+    letter, message = _GRADES[bisect_right(_GRADE_CUTOFFS, score)]
 
     return {"score": round(score), "letter": letter, "message": message}
 
@@ -1335,8 +1775,34 @@ def cls_calculate_weekly_grade(stats: dict) -> dict:
 # MAIN APPLICATION
 # ============================================================================
 
+@lru_cache(maxsize=1)
+def _ansi_supported() -> bool:
+    """True if stdout is a terminal that understands ANSI escape codes."""
+    if not sys.stdout.isatty():
+        return False
+    if os.name != "nt":
+        return True
+    # Windows 10+ consoles handle VT sequences once the mode is switched on
+    try:
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = wintypes.DWORD()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        return False
+
+
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+    # Escape codes (home + clear) avoid spawning a shell on every redraw
+    if _ansi_supported():
+        sys.stdout.write("\x1b[H\x1b[2J")
+        sys.stdout.flush()
+    else:
+        os.system("cls" if os.name == "nt" else "clear")
 
 
 def start_session():
@@ -1372,9 +1838,8 @@ def start_session():
     # Timer
     timer = StudyTimer(planned_mins)
     start_time = datetime.now()
-    actual_mins, breaks, completed = timer.run()
+    actual_mins, breaks, completed, total_break_time = timer.run()
     end_time = datetime.now()
-    total_break_time = sum(b["duration_seconds"] for b in breaks)
 
     # Notes
     notes = collect_notes(topic)
@@ -1417,44 +1882,51 @@ def start_session():
     display_analysis(session)
 
 
+@_buffered_output
+def display_main_menu():
+    """Draw the main menu banner, today's stats and the options."""
+    print("\n╔" + "═" * 48 + "╗")
+    print("║                                                ║")
+    print("║   🧠 SMART STUDY & FOCUS COMPANION             ║")
+    print("║      AI-Powered Study Tracker                  ║")
+    print("║                                                ║")
+    print("╚" + "═" * 48 + "╝")
+
+    sessions = load_sessions()
+    if sessions:
+        today = datetime.now().date()
+        today_sessions = sessions_started_between(
+            today.isoformat(), (today + timedelta(days=1)).isoformat()
+        )
+        today_time = sum(s.actual_minutes for s in today_sessions)
+        print(f"\n  📅 Today: {len(today_sessions)} sessions | {today_time:.0f} min")
+
+        # Show streak
+        streak_data = study_streak()
+        if streak_data["current"] > 0:
+            print(f"  🔥 Streak: {streak_data['current']} days")
+
+        # Show if issues detected recently
+        recent_issues = sum(1 for s in sessions[-5:]
+                          if s.topic_drift_detected or s.overconfidence_detected)
+        if recent_issues > 0:
+            print(f"  ⚠️  {recent_issues}/5 recent sessions had focus issues")
+
+    api_status = "Claude API ✓" if ANTHROPIC_API_KEY else "Local analysis"
+    print(f"  🤖 AI: {api_status}")
+
+    print("\n" + "─" * 50)
+    print("\n  [1] 📚 Start Study Session")
+    print("  [2] 📊 Weekly Report")
+    print("  [3] 📜 View History")
+    print("  [4] 🚪 Exit")
+
+
 def main_menu():
     """Main menu."""
     while True:
         clear_screen()
-
-        print("\n╔" + "═" * 48 + "╗")
-        print("║                                                ║")
-        print("║   🧠 SMART STUDY & FOCUS COMPANION             ║")
-        print("║      AI-Powered Study Tracker                  ║")
-        print("║                                                ║")
-        print("╚" + "═" * 48 + "╝")
-
-        sessions = load_sessions()
-        if sessions:
-            today = datetime.now().strftime("%Y-%m-%d")
-            today_sessions = [s for s in sessions if s.start_time.startswith(today)]
-            today_time = sum(s.actual_minutes for s in today_sessions)
-            print(f"\n  📅 Today: {len(today_sessions)} sessions | {today_time:.0f} min")
-
-            # Show streak
-            streak_data = WeeklyReportGenerator._calculate_streak(sessions)
-            if streak_data["current"] > 0:
-                print(f"  🔥 Streak: {streak_data['current']} days")
-
-            # Show if issues detected recently
-            recent_issues = sum(1 for s in sessions[-5:]
-                              if s.topic_drift_detected or s.overconfidence_detected)
-            if recent_issues > 0:
-                print(f"  ⚠️  {recent_issues}/5 recent sessions had focus issues")
-
-        api_status = "Claude API ✓" if ANTHROPIC_API_KEY else "Local analysis"
-        print(f"  🤖 AI: {api_status}")
-
-        print("\n" + "─" * 50)
-        print("\n  [1] 📚 Start Study Session")
-        print("  [2] 📊 Weekly Report")
-        print("  [3] 📜 View History")
-        print("  [4] 🚪 Exit")
+        display_main_menu()
 
         choice = input("\n  Select: ").strip()
 
@@ -1588,16 +2060,15 @@ def load_demo_mode():
     demo_dir.mkdir(exist_ok=True)
 
     # Backup existing data if any
+    _migrate_legacy_sessions()
     if SESSIONS_FILE.exists():
-        import shutil
-        backup_file = demo_dir / f"sessions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        backup_file = demo_dir / f"sessions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
         shutil.copy(SESSIONS_FILE, backup_file)
         print(f"  📁 Backed up existing data to {backup_file.name}")
 
     # Load demo sessions
     demo_sessions = generate_demo_sessions()
-    with open(SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump({"sessions": demo_sessions}, f, indent=2)
+    _write_sessions_file(demo_sessions)
 
     print(f"  ✅ Loaded {len(demo_sessions)} demo sessions")
     print("\n  Demo includes:")
@@ -1614,6 +2085,10 @@ def load_demo_mode():
 # EXPORT FUNCTIONALITY
 # ============================================================================
 
+# Emoji and other symbols dropped from recommendations in the plain-text export
+_NON_TEXT_RE = re.compile(r'[^\w\s.,!?;:\'-]')
+
+
 def export_weekly_report():
     """Export weekly report to a text file."""
     sessions = load_sessions()
@@ -1625,13 +2100,16 @@ def export_weekly_report():
     report = WeeklyReportGenerator.generate(sessions)
     overview = report["overview"]
     this_week = overview["this_week"]
+    # One timestamp for both the header and the file name, so they agree
+    # even if the export runs across midnight
+    now = datetime.now()
 
     # Build report text
     lines = []
     lines.append("=" * 60)
     lines.append("SMART STUDY & FOCUS COMPANION - WEEKLY REPORT")
     lines.append("=" * 60)
-    lines.append(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    lines.append(f"\nGenerated: {now.strftime('%Y-%m-%d %H:%M')}")
     lines.append(f"Week: {report['period']['start']} to {report['period']['end']}")
 
     # Streak
@@ -1694,7 +2172,7 @@ def export_weekly_report():
     lines.append("-" * 60)
     for rec in report["recommendations"]:
         # Remove emoji for plain text
-        clean_rec = re.sub(r'[^\w\s.,!?;:\'-]', '', rec).strip()
+        clean_rec = _NON_TEXT_RE.sub('', rec).strip()
         lines.append(f"  * {clean_rec}")
 
     # Grade
@@ -1705,7 +2183,7 @@ def export_weekly_report():
     lines.append("=" * 60)
 
     # Write to file
-    export_path = Path(__file__).parent / f"weekly_report_{datetime.now().strftime('%Y%m%d')}.txt"
+    export_path = Path(__file__).parent / f"weekly_report_{now.strftime('%Y%m%d')}.txt"
     with open(export_path, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
@@ -1770,11 +2248,16 @@ def show_quick_stats():
         print("\n  No sessions recorded yet.")
         return
 
-    total_time = sum(s.actual_minutes for s in sessions)
-    avg_score = sum(s.topic_relevance_score for s in sessions) / len(sessions)
-    topics = set(s.topic for s in sessions)
+    # One pass over the history for all three totals
+    total_time = total_score = 0
+    topics = set()
+    for s in sessions:
+        total_time += s.actual_minutes
+        total_score += s.topic_relevance_score
+        topics.add(s.topic)
+    avg_score = total_score / len(sessions)
 
-    streak = WeeklyReportGenerator._calculate_streak(sessions)
+    streak = study_streak()
 
     print(f"\n  Total Sessions: {len(sessions)}")
     print(f"  Total Study Time: {total_time:.0f} min ({total_time/60:.1f} hours)")
@@ -1786,8 +2269,7 @@ def show_quick_stats():
     # This week
     today = datetime.now().date()
     week_start = today - timedelta(days=today.weekday())
-    this_week = [s for s in sessions
-                 if datetime.fromisoformat(s.start_time).date() >= week_start]
+    this_week = sessions_started_between(week_start.isoformat())
 
     if this_week:
         week_time = sum(s.actual_minutes for s in this_week)
@@ -1800,8 +2282,13 @@ def reset_data():
     confirm = input("  Type 'DELETE' to confirm: ").strip()
 
     if confirm == "DELETE":
-        if SESSIONS_FILE.exists():
-            os.remove(SESSIONS_FILE)
+        # unlink(missing_ok) instead of exists() + remove(), which races
+        # with another process deleting first; also clear any temp file
+        # left by an interrupted rewrite
+        for path in (SESSIONS_FILE, LEGACY_SESSIONS_FILE,
+                     SESSIONS_FILE.with_suffix(".jsonl.tmp")):
+            path.unlink(missing_ok=True)
+        AIEngine.clear_cache()  # cached responses quote the notes
         print("  ✅ All data has been reset.")
     else:
         print("  ❌ Reset cancelled.")
@@ -0,0 +1,9 @@
+"""
+Shared pytest configuration.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
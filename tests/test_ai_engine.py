@@ -4,13 +4,9 @@ Tests the focus scoring and note analysis without Claude API.
 """
 
 import pytest
-import sys
-from pathlib import Path
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from focus_companion import AIEngine
+import focus_companion
+from focus_companion import AIEngine, _disk_cached
 
 
 class TestLocalAnalysis:
@@ -226,3 +222,116 @@ class TestRelevanceScoring:
         # Detailed notes should have equal or higher relevance
         assert result_detailed["topic_relevance"] >= result_brief["topic_relevance"]
 
+    def test_topic_words_match_whole_words_only(self):
+        """A topic word inside a longer note word should not count as a match."""
+        result = AIEngine._analyze_locally(
+            topic="Java",
+            notes=["JavaScript closures capture outer variables"],
+            planned_mins=25,
+            actual_mins=25,
+            break_count=0,
+            total_break_secs=0
+        )
+
+        # Only the note-length bonus remains
+        assert result["topic_relevance"] == 5.0
+
+    def test_non_latin_topic_words_match(self):
+        """Topics in non-Latin scripts should be tokenized and matched too."""
+        result = AIEngine._analyze_locally(
+            topic="Русская история",
+            notes=["Русская история: реформы Петра Первого", "Русская история и армия"],
+            planned_mins=25,
+            actual_mins=25,
+            break_count=0,
+            total_break_secs=0
+        )
+
+        assert result["topic_relevance"] == 100
+
+    def test_plural_topic_words_match(self):
+        """Notes using the plural of a topic word should still match it."""
+        result = AIEngine._analyze_locally(
+            topic="Python: Function",
+            notes=["Functions group reusable code"],
+            planned_mins=25,
+            actual_mins=25,
+            break_count=0,
+            total_break_secs=0
+        )
+
+        assert result["topic_relevance"] == 54.0
+
+
+class TestClaudeResponseCache:
+    """Test the on-disk layer under the memoized Claude helpers."""
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(focus_companion, "CLAUDE_CACHE_DIR", tmp_path / "claude_cache")
+        return tmp_path / "claude_cache"
+
+    def test_result_survives_a_new_process(self, cache_dir):
+        """A second wrapper over the same directory should not call through."""
+        calls = []
+
+        def fake_claude(topic, notes):
+            calls.append(topic)
+            return ("summary", 80.0, "feedback")
+
+        first = _disk_cached(fake_claude)("python", ("note",))
+        second = _disk_cached(fake_claude)("python", ("note",))
+
+        assert first == second == ("summary", 80.0, "feedback")
+        assert calls == ["python"]
+        assert len(list(cache_dir.glob("*.json"))) == 1
+
+    def test_key_normalizes_lookup_but_not_arguments(self, cache_dir):
+        """Inputs sharing a key should share an entry; the call sees them unchanged."""
+        calls = []
+
+        @_disk_cached(key=lambda topic: (topic.strip().lower(),))
+        def fake_claude(topic):
+            calls.append(topic)
+            return (f"summary of {topic}",)
+
+        assert fake_claude(" Python ") == ("summary of  Python ",)
+        assert fake_claude("python") == ("summary of  Python ",)
+        assert calls == [" Python "]
+
+    def test_prompt_change_invalidates_entries(self, cache_dir, monkeypatch):
+        """Answers cached for an older prompt should not be served."""
+        calls = []
+        cached = _disk_cached(lambda topic: (calls.append(topic) or topic,))
+
+        cached("python")
+        monkeypatch.setattr(focus_companion, "CLAUDE_SYSTEM_PROMPT", "Revised instructions")
+        cached("python")
+
+        assert calls == ["python", "python"]
+        assert not list(cache_dir.glob("*.tmp"))
+
+    def test_failures_are_not_cached(self, cache_dir):
+        """Exceptions should propagate and leave nothing on disk."""
+        def failing_claude(topic):
+            raise ValueError("no JSON object in Claude response")
+
+        with pytest.raises(ValueError):
+            _disk_cached(failing_claude)("python")
+        assert not cache_dir.exists()
+
+    def test_evicts_least_recently_used(self, cache_dir, monkeypatch):
+        """The directory should stay within CLAUDE_CACHE_MAX_ENTRIES."""
+        monkeypatch.setattr(focus_companion, "CLAUDE_CACHE_MAX_ENTRIES", 2)
+        cached = _disk_cached(lambda topic: (topic,))
+
+        for topic in ("a", "b", "c"):
+            cached(topic)
+
+        assert len(list(cache_dir.glob("*.json"))) == 2
+
+    def test_clear_cache_removes_disk_entries(self, cache_dir):
+        """clear_cache should drop the on-disk layer too."""
+        _disk_cached(lambda topic: (topic,))("python")
+        AIEngine.clear_cache()
+        assert not cache_dir.exists()
@@ -3,16 +3,15 @@ Tests for data persistence (save/load sessions) and StudySession model.
 """
 
 import pytest
-import sys
+import os
 import json
 import tempfile
-from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from focus_companion import StudySession, load_sessions, save_session, SESSIONS_FILE
+from focus_companion import (
+    StudySession, load_sessions, save_session, sessions_started_between, study_streak,
+    SESSIONS_FILE
+)
 
 
 class TestStudySessionModel:
@@ -99,6 +98,53 @@ class TestStudySessionModel:
         assert result["overconfidence_detected"] is True
         assert "Practice coding" in result["revision_tasks"]
 
+    def test_start_date_is_parsed_but_not_serialized(self):
+        """start_date should come from start_time and stay out of to_dict()."""
+        session = StudySession(
+            id="test-date",
+            topic="Python",
+            planned_minutes=25,
+            actual_minutes=25.0,
+            start_time="2024-01-15T23:30:00",
+            end_time="2024-01-15T23:55:00",
+            breaks=[],
+            total_break_time=0,
+            notes=["Generators"],
+            ai_summary="",
+            topic_relevance_score=80.0,
+            focus_feedback="",
+            completed=True
+        )
+
+        assert session.start_date == date(2024, 1, 15)
+        assert not any(key.startswith("_") for key in session.to_dict())
+
+    def test_derived_fields_follow_reassignment(self):
+        """start_date and topic_lower should not go stale when their fields change."""
+        session = StudySession(
+            id="test-date",
+            topic="Python",
+            planned_minutes=25,
+            actual_minutes=25.0,
+            start_time="2024-01-15T23:30:00",
+            end_time="2024-01-15T23:55:00",
+            breaks=[],
+            total_break_time=0,
+            notes=["Generators"],
+            ai_summary="",
+            topic_relevance_score=80.0,
+            focus_feedback="",
+            completed=True
+        )
+        assert session.start_date == date(2024, 1, 15)
+        assert session.topic_lower == "python"
+
+        session.start_time = "2024-01-16T09:00:00"
+        session.topic = "Rust"
+
+        assert session.start_date == date(2024, 1, 16)
+        assert session.topic_lower == "rust"
+
     def test_from_dict(self):
         """Should recreate session from dictionary."""
         data = {
@@ -422,3 +468,149 @@ class TestSessionFieldValidation:
 
         assert session_min.topic_relevance_score == 0.0
 
+
+class TestSessionStorage:
+    """Test save_session/load_sessions against a temporary data directory."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        import focus_companion
+        monkeypatch.setattr(focus_companion, "SESSIONS_FILE", tmp_path / "sessions.jsonl")
+        monkeypatch.setattr(focus_companion, "LEGACY_SESSIONS_FILE", tmp_path / "sessions.json")
+        monkeypatch.setattr(focus_companion, "_CACHE", {
+            "signature": None, "sessions": [], "start_times": [], "ordered": True
+        })
+        return tmp_path
+
+    @staticmethod
+    def make_session(session_id: str) -> StudySession:
+        return StudySession(
+            id=session_id,
+            topic="Storage",
+            planned_minutes=25,
+            actual_minutes=25,
+            start_time="2024-01-21T10:00:00",
+            end_time="2024-01-21T10:25:00",
+            breaks=[],
+            total_break_time=0,
+            notes=["Unicode: 日本語"],
+            ai_summary="Storage test",
+            topic_relevance_score=80.0,
+            focus_feedback="Good",
+            completed=True
+        )
+
+    def test_load_without_file(self, data_dir):
+        """Should return an empty list when nothing has been saved."""
+        assert load_sessions() == []
+
+    def test_save_appends_one_line_per_session(self, data_dir):
+        """Each save should append exactly one JSON line."""
+        save_session(self.make_session("first"))
+        save_session(self.make_session("second"))
+
+        lines = (data_dir / "sessions.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["id"] == "second"
+
+    def test_save_then_load_round_trip(self, data_dir):
+        """Saved sessions should load back in order."""
+        save_session(self.make_session("a"))
+        save_session(self.make_session("b"))
+
+        sessions = load_sessions()
+        assert [s.id for s in sessions] == ["a", "b"]
+        assert sessions[0].notes == ["Unicode: 日本語"]
+
+    def test_migrates_legacy_json_file(self, data_dir):
+        """A legacy sessions.json should be converted to JSON Lines once."""
+        legacy = {"sessions": [self.make_session("legacy").to_dict()]}
+        (data_dir / "sessions.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        sessions = load_sessions()
+
+        assert [s.id for s in sessions] == ["legacy"]
+        assert (data_dir / "sessions.jsonl").exists()
+        assert not (data_dir / "sessions.json").exists()
+        assert (data_dir / "sessions.json.bak").exists()
+
+    def test_load_reflects_external_changes(self, data_dir):
+        """Cached sessions should be dropped when the file changes on disk."""
+        save_session(self.make_session("cached"))
+        assert [s.id for s in load_sessions()] == ["cached"]
+
+        path = data_dir / "sessions.jsonl"
+        path.write_text(json.dumps(self.make_session("replaced").to_dict()) + "\n",
+                        encoding="utf-8")
+        os.utime(path, ns=(0, 1))
+
+        assert [s.id for s in load_sessions()] == ["replaced"]
+
+    def test_load_detects_append_with_same_mtime(self, data_dir):
+        """An append within the mtime resolution should still invalidate the cache."""
+        save_session(self.make_session("first"))
+        assert [s.id for s in load_sessions()] == ["first"]
+
+        path = data_dir / "sessions.jsonl"
+        mtime_ns = path.stat().st_mtime_ns
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.make_session("second").to_dict()) + "\n")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+        assert [s.id for s in load_sessions()] == ["first", "second"]
+
+    def test_concurrent_append_is_not_hidden_by_cache(self, data_dir, monkeypatch):
+        """A record appended by another writer around our save should still load."""
+        import focus_companion
+        save_session(self.make_session("1"))
+        assert [s.id for s in load_sessions()] == ["1"]
+
+        other = json.dumps(self.make_session("3").to_dict()).encode("utf-8") + b"\n"
+        real_write = os.write
+
+        def write_then_race(fd, data):
+            written = real_write(fd, data)
+            real_write(fd, other)  # another worker appends right after us
+            return written
+
+        monkeypatch.setattr(focus_companion.os, "write", write_then_race)
+        save_session(self.make_session("2"))
+        monkeypatch.setattr(focus_companion.os, "write", real_write)
+
+        assert [s.id for s in load_sessions()] == ["1", "2", "3"]
+
+    def test_sessions_started_between(self, data_dir):
+        """Range lookups should match a scan, in or out of time order."""
+        for session_id, start in [("mon", "2024-01-15T09:00:00"),
+                                  ("tue", "2024-01-16T09:00:00"),
+                                  ("tue2", "2024-01-16T18:30:00"),
+                                  ("wed", "2024-01-17T09:00:00")]:
+            session = self.make_session(session_id)
+            session.start_time = start
+            save_session(session)
+
+        day = sessions_started_between("2024-01-16", "2024-01-17")
+        assert [s.id for s in day] == ["tue", "tue2"]
+        assert [s.id for s in sessions_started_between("2024-01-16T12")] == ["tue2", "wed"]
+
+        late_entry = self.make_session("backfill")
+        late_entry.start_time = "2024-01-16T12:00:00"
+        save_session(late_entry)
+
+        day = sessions_started_between("2024-01-16", "2024-01-17")
+        assert sorted(s.id for s in day) == ["backfill", "tue", "tue2"]
+
+    def test_study_streak_follows_saves(self, data_dir):
+        """The cached streak should pick up a session saved after it was computed."""
+        today = date.today()
+        yesterday = self.make_session("yesterday")
+        yesterday.start_time = f"{today - timedelta(days=1)}T10:00:00"
+        save_session(yesterday)
+        assert study_streak()["current"] == 1
+
+        todays = self.make_session("today")
+        todays.start_time = f"{today}T10:00:00"
+        save_session(todays)
+        assert study_streak() == {
+            "current": 2, "longest": 2, "last_study": today.isoformat()
+        }
@@ -2,15 +2,17 @@
 Tests for RevisionTaskGenerator and NextSessionPlanner.
 """
 
-import pytest
-import sys
-from pathlib import Path
+import re
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
 from focus_companion import RevisionTaskGenerator, NextSessionPlanner
 
+# Words an acceptable next-session plan should contain, per scenario
+_REFOCUS_RE = re.compile(r"calculus|focus|restart")
+_ACTIVE_RE = re.compile(r"recall|test|review")
+_CONTINUE_RE = re.compile(r"connect|apply|problem|strong")
+
 
 class TestRevisionTaskGenerator:
     """Test revision task generation logic."""
@@ -175,7 +177,7 @@ class TestNextSessionPlanner:
 
         plan_lower = plan.lower()
         # Should mention refocusing or the topic
-        assert "calculus" in plan_lower or "focus" in plan_lower or "restart" in plan_lower
+        assert _REFOCUS_RE.search(plan_lower)
 
     def test_overconfidence_suggests_active_learning(self):
         """Overconfidence should suggest active learning methods."""
@@ -190,7 +192,7 @@ class TestNextSessionPlanner:
 
         plan_lower = plan.lower()
         # Should suggest recall or active methods
-        assert "recall" in plan_lower or "test" in plan_lower or "review" in plan_lower
+        assert _ACTIVE_RE.search(plan_lower)
 
     def test_good_session_suggests_continuation(self):
         """Good session should suggest continuing to next topic."""
@@ -205,7 +207,7 @@ class TestNextSessionPlanner:
 
         plan_lower = plan.lower()
         # Should suggest continuation or advancement
-        assert "connect" in plan_lower or "apply" in plan_lower or "problem" in plan_lower or "strong" in plan_lower
+        assert _CONTINUE_RE.search(plan_lower)
 
     def test_plan_is_not_empty_for_any_input(self):
         """Should always return a non-empty plan."""
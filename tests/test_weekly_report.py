@@ -3,15 +3,16 @@ Tests for WeeklyReportGenerator and CLIChart visualization.
 """
 
 import pytest
-import sys
-from pathlib import Path
 from datetime import datetime, timedelta
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from focus_companion import WeeklyReportGenerator, CLIChart, StudySession
 
+# Read the clock once so every test agrees on "today" and the current week
+_NOW = datetime.now()
+_TODAY = _NOW.date()
+_WEEKDAY = _NOW.weekday()  # 0=Monday, 6=Sunday
+_WEEK_START = _TODAY - timedelta(days=_WEEKDAY)
+
 
 def create_test_session(
     topic: str = "Test Topic",
@@ -22,7 +23,7 @@ def create_test_session(
     days_ago: int = 0
 ) -> StudySession:
     """Helper to create test session objects."""
-    session_time = datetime.now() - timedelta(days=days_ago)
+    session_time = _NOW - timedelta(days=days_ago)
     return StudySession(
         id=f"test-{session_time.timestamp()}",
         topic=topic,
@@ -46,13 +47,17 @@ def create_test_session(
     )
 
 
+# Shared input for tests that only check the report's structure
+_BASELINE_SESSIONS = [create_test_session(days_ago=i) for i in range(3)]
+_BASELINE_REPORT = WeeklyReportGenerator.generate(_BASELINE_SESSIONS)
+
+
 class TestWeeklyReportGeneration:
     """Test WeeklyReportGenerator.generate method."""
 
     def test_returns_required_sections(self):
         """Report should contain all required sections."""
-        sessions = [create_test_session(days_ago=i) for i in range(3)]
-        report = WeeklyReportGenerator.generate(sessions)
+        report = _BASELINE_REPORT
 
         assert "period" in report
         assert "overview" in report
@@ -73,63 +78,50 @@ class TestWeeklyReportGeneration:
 
     def test_period_is_current_week(self):
         """Period should represent current week."""
-        sessions = [create_test_session()]
-        report = WeeklyReportGenerator.generate(sessions)
+        week_end = _WEEK_START + timedelta(days=6)
+
+        assert _BASELINE_REPORT["period"]["start"] == _WEEK_START.isoformat()
+        assert _BASELINE_REPORT["period"]["end"] == week_end.isoformat()
 
-        today = datetime.now().date()
-        week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
 
-        assert report["period"]["start"] == week_start.isoformat()
-        assert report["period"]["end"] == week_end.isoformat()
+@pytest.fixture(scope="module")
+def overview_report():
+    """One report whose sessions cover the time, relevance and issue tests."""
+    sessions = [
+        create_test_session(actual_minutes=25, relevance_score=80,
+                            drift_detected=True, days_ago=0),
+        create_test_session(actual_minutes=30, relevance_score=60,
+                            overconfidence_detected=True, days_ago=1),
+        create_test_session(actual_minutes=20, relevance_score=70,
+                            days_ago=2),  # No issues
+    ]
+    return WeeklyReportGenerator.generate(sessions)
 
 
 class TestOverviewCalculation:
     """Test the overview statistics calculation."""
 
-    def test_calculates_total_time(self):
+    def test_calculates_total_time(self, overview_report):
         """Should sum up all session times."""
-        sessions = [
-            create_test_session(actual_minutes=25, days_ago=0),
-            create_test_session(actual_minutes=30, days_ago=1),
-            create_test_session(actual_minutes=20, days_ago=2),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        assert report["overview"]["this_week"]["time"] == 75
+        assert overview_report["overview"]["this_week"]["time"] == 75
 
     def test_counts_sessions(self):
         """Should count total sessions within the week."""
         # Create sessions that are all within the current week
         # Use days_ago based on current weekday to ensure they're in this week
-        today_weekday = datetime.now().weekday()  # 0=Monday, 6=Sunday
         # Create sessions only for days from start of week to today
-        sessions = [create_test_session(days_ago=i) for i in range(today_weekday + 1)]
+        sessions = [create_test_session(days_ago=i) for i in range(_WEEKDAY + 1)]
         report = WeeklyReportGenerator.generate(sessions)
 
-        assert report["overview"]["this_week"]["sessions"] == today_weekday + 1
+        assert report["overview"]["this_week"]["sessions"] == _WEEKDAY + 1
 
-    def test_calculates_average_relevance(self):
+    def test_calculates_average_relevance(self, overview_report):
         """Should calculate average relevance score."""
-        sessions = [
-            create_test_session(relevance_score=80, days_ago=0),
-            create_test_session(relevance_score=60, days_ago=1),
-            create_test_session(relevance_score=70, days_ago=2),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        assert report["overview"]["this_week"]["avg_relevance"] == 70
+        assert overview_report["overview"]["this_week"]["avg_relevance"] == 70
 
-    def test_counts_issues(self):
+    def test_counts_issues(self, overview_report):
         """Should count sessions with issues."""
-        sessions = [
-            create_test_session(drift_detected=True, days_ago=0),
-            create_test_session(overconfidence_detected=True, days_ago=1),
-            create_test_session(days_ago=2),  # No issues
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        assert report["overview"]["this_week"]["issues"] == 2
+        assert overview_report["overview"]["this_week"]["issues"] == 2
 
 
 class TestDailyBreakdown:
@@ -137,17 +129,11 @@ class TestDailyBreakdown:
 
     def test_has_seven_days(self):
         """Should have breakdown for all 7 days."""
-        sessions = [create_test_session()]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        assert len(report["daily_breakdown"]) == 7
+        assert len(_BASELINE_REPORT["daily_breakdown"]) == 7
 
     def test_day_names_correct(self):
         """Should have correct day names."""
-        sessions = [create_test_session()]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        day_names = [d["day"] for d in report["daily_breakdown"]]
+        day_names = [d["day"] for d in _BASELINE_REPORT["daily_breakdown"]]
         assert day_names == ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
     def test_accumulates_daily_minutes(self):
@@ -159,35 +145,32 @@ class TestDailyBreakdown:
         ]
         report = WeeklyReportGenerator.generate(sessions)
 
-        today_idx = datetime.now().weekday()
-        assert report["daily_breakdown"][today_idx]["minutes"] == 45
+        assert report["daily_breakdown"][_WEEKDAY]["minutes"] == 45
+
+
+@pytest.fixture(scope="module")
+def topic_report():
+    """Report with two Python sessions and one JavaScript session."""
+    sessions = [
+        create_test_session(topic="Python", actual_minutes=30, days_ago=0),
+        create_test_session(topic="Python", actual_minutes=25, days_ago=1),
+        create_test_session(topic="JavaScript", days_ago=2),
+    ]
+    return WeeklyReportGenerator.generate(sessions)
 
 
 class TestTopicAnalysis:
     """Test topic-level analysis."""
 
-    def test_groups_by_topic(self):
+    def test_groups_by_topic(self, topic_report):
         """Should group sessions by topic."""
-        sessions = [
-            create_test_session(topic="Python", days_ago=0),
-            create_test_session(topic="Python", days_ago=1),
-            create_test_session(topic="JavaScript", days_ago=2),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        topics = [t["topic"] for t in report["topic_analysis"]]
+        topics = [t["topic"] for t in topic_report["topic_analysis"]]
         assert "Python" in topics
         assert "JavaScript" in topics
 
-    def test_calculates_topic_time(self):
+    def test_calculates_topic_time(self, topic_report):
         """Should calculate total time per topic."""
-        sessions = [
-            create_test_session(topic="Python", actual_minutes=30, days_ago=0),
-            create_test_session(topic="Python", actual_minutes=25, days_ago=1),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        python_topic = next(t for t in report["topic_analysis"] if t["topic"] == "Python")
+        python_topic = next(t for t in topic_report["topic_analysis"] if t["topic"] == "Python")
         assert python_topic["time"] == 55
 
     def test_understanding_levels(self):
@@ -210,10 +193,7 @@ class TestTimeVsRetention:
 
     def test_returns_session_buckets(self):
         """Should return short, medium, long session buckets."""
-        sessions = [create_test_session()]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        tvr = report["time_vs_retention"]
+        tvr = _BASELINE_REPORT["time_vs_retention"]
         assert "short_sessions" in tvr
         assert "medium_sessions" in tvr
         assert "long_sessions" in tvr
@@ -234,85 +214,70 @@ class TestTimeVsRetention:
 
     def test_has_optimal_duration(self):
         """Should determine optimal session duration."""
-        sessions = [create_test_session(days_ago=i) for i in range(5)]
-        report = WeeklyReportGenerator.generate(sessions)
+        assert "optimal_duration" in _BASELINE_REPORT["time_vs_retention"]
+
 
-        assert "optimal_duration" in report["time_vs_retention"]
+@pytest.fixture(scope="module")
+def problem_topics():
+    """Flagged topics for a week with one struggling, one drifting and one good topic.
+
+    Topics are assessed independently, so one report serves every case.
+    """
+    sessions = [
+        create_test_session(topic="Struggling", relevance_score=40, days_ago=0),
+        create_test_session(topic="Struggling", relevance_score=45, days_ago=1),
+        create_test_session(topic="Drifty", drift_detected=True, relevance_score=70, days_ago=0),
+        create_test_session(topic="Drifty", drift_detected=True, relevance_score=70, days_ago=1),
+        create_test_session(topic="Great", relevance_score=85, days_ago=0),
+        create_test_session(topic="Great", relevance_score=90, days_ago=1),
+    ]
+    report = WeeklyReportGenerator.generate(sessions)
+    return [p["topic"] for p in report["problem_areas"]]
 
 
 class TestProblemAreas:
     """Test problem area identification."""
 
-    def test_identifies_low_score_topics(self):
+    def test_identifies_low_score_topics(self, problem_topics):
         """Should flag topics with low scores."""
-        sessions = [
-            create_test_session(topic="Struggling", relevance_score=40, days_ago=0),
-            create_test_session(topic="Struggling", relevance_score=45, days_ago=1),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        problem_topics = [p["topic"] for p in report["problem_areas"]]
         assert "Struggling" in problem_topics
 
-    def test_identifies_drift_patterns(self):
+    def test_identifies_drift_patterns(self, problem_topics):
         """Should flag topics with frequent drift."""
-        sessions = [
-            create_test_session(topic="Drifty", drift_detected=True, relevance_score=70, days_ago=0),
-            create_test_session(topic="Drifty", drift_detected=True, relevance_score=70, days_ago=1),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        problem_topics = [p["topic"] for p in report["problem_areas"]]
         assert "Drifty" in problem_topics
 
-    def test_good_topics_not_flagged(self):
+    def test_good_topics_not_flagged(self, problem_topics):
         """Should not flag topics with good scores and no issues."""
-        sessions = [
-            create_test_session(topic="Great", relevance_score=85, days_ago=0),
-            create_test_session(topic="Great", relevance_score=90, days_ago=1),
-        ]
-        report = WeeklyReportGenerator.generate(sessions)
-
-        problem_topics = [p["topic"] for p in report["problem_areas"]]
         assert "Great" not in problem_topics
 
 
 class TestCLIChart:
     """Test CLI chart visualization utilities."""
 
-    def test_horizontal_bar_basic(self):
-        """Should create basic horizontal bar."""
-        result = CLIChart.horizontal_bar("Test", 50, 100, width=10)
-
-        assert "Test" in result
-        assert "50" in result
-        assert "█" in result
-
-    def test_horizontal_bar_full(self):
-        """Full bar should be all filled."""
-        result = CLIChart.horizontal_bar("Full", 100, 100, width=10)
-
-        assert "██████████" in result
-
-    def test_horizontal_bar_empty(self):
-        """Empty bar should be all empty."""
-        result = CLIChart.horizontal_bar("Empty", 0, 100, width=10)
-
-        assert "░░░░░░░░░░" in result
-
-    def test_horizontal_bar_zero_max(self):
-        """Should handle zero max value."""
-        result = CLIChart.horizontal_bar("Zero", 50, 0, width=10)
-
-        # Should not crash, should show empty bar
-        assert "░░░░░░░░░░" in result
-
-    def test_sparkline_basic(self):
-        """Should create sparkline from values."""
-        result = CLIChart.sparkline([1, 2, 3, 4, 5])
-
-        # Should contain various height characters
-        assert len(result) >= 5
+    @pytest.mark.parametrize("label,value,max_val,expected", [
+        ("Test", 50, 100, ["Test", "50", "█"]),
+        ("Full", 100, 100, ["██████████"]),
+        ("Empty", 0, 100, ["░░░░░░░░░░"]),
+        ("Zero", 50, 0, ["░░░░░░░░░░"]),  # Zero max should not crash
+        ("Over", 150, 100, ["[██████████]"]),
+        ("Under", -20, 100, ["[░░░░░░░░░░]"]),
+    ], ids=["basic", "full", "empty", "zero_max", "clamps_over", "clamps_under"])
+    def test_horizontal_bar(self, label, value, max_val, expected):
+        """Bar should be filled in proportion to value, within its width."""
+        result = CLIChart.horizontal_bar(label, value, max_val, width=10)
+
+        for substr in expected:
+            assert substr in result
+
+    @pytest.mark.parametrize("values,min_length", [
+        ([1, 2, 3, 4, 5], 5),
+        ([50], 1),
+    ], ids=["basic", "single_value"])
+    def test_sparkline(self, values, min_length):
+        """Should create one character per value."""
+        result = CLIChart.sparkline(values)
+
+        assert len(result) >= min_length
 
     def test_sparkline_empty(self):
         """Should handle empty values."""
@@ -321,33 +286,12 @@ class TestCLIChart:
         # Should return placeholder
         assert "─" in result
 
-    def test_sparkline_single_value(self):
-        """Should handle single value."""
-        result = CLIChart.sparkline([50])
-
-        assert len(result) >= 1
-
-    def test_trend_arrow_up(self):
-        """Should show up arrow for increase."""
-        result = CLIChart.trend_arrow(120, 100)
-
-        assert result == "↑"
-
-    def test_trend_arrow_down(self):
-        """Should show down arrow for decrease."""
-        result = CLIChart.trend_arrow(80, 100)
-
-        assert result == "↓"
-
-    def test_trend_arrow_stable(self):
-        """Should show right arrow for stable."""
-        result = CLIChart.trend_arrow(102, 100)
-
-        assert result == "→"
-
-    def test_trend_arrow_zero_previous(self):
-        """Should handle zero previous value."""
-        result = CLIChart.trend_arrow(50, 0)
-
-        assert result == "→"
-
+    @pytest.mark.parametrize("current,previous,arrow", [
+        (120, 100, "↑"),
+        (80, 100, "↓"),
+        (102, 100, "→"),
+        (50, 0, "→"),  # Zero previous value
+    ], ids=["up", "down", "stable", "zero_previous"])
+    def test_trend_arrow(self, current, previous, arrow):
+        """Should show the direction of change."""
+        assert CLIChart.trend_arrow(current, previous) == arrow